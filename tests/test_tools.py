@@ -0,0 +1,59 @@
+"""Test shared tools utilities."""
+import sys
+
+import pytest
+
+from bigym.robots.configs.h1 import H1
+from tools.shared.utils import LazyRegistry, ROBOTS
+
+LAZY_MODULE = "colorsys"
+
+
+@pytest.fixture
+def registry(monkeypatch) -> LazyRegistry:
+    monkeypatch.delitem(sys.modules, LAZY_MODULE, raising=False)
+    return LazyRegistry(
+        {
+            "RGB to HSV": (LAZY_MODULE, "rgb_to_hsv"),
+            "HSV to RGB": (LAZY_MODULE, "hsv_to_rgb"),
+            "None": None,
+        }
+    )
+
+
+def test_lazy_registry_imports_on_first_access(registry):
+    assert LAZY_MODULE not in sys.modules
+    rgb_to_hsv = registry["RGB to HSV"]
+    assert LAZY_MODULE in sys.modules
+    assert rgb_to_hsv is sys.modules[LAZY_MODULE].rgb_to_hsv
+    assert registry["RGB to HSV"] is rgb_to_hsv
+
+
+def test_lazy_registry_keys_do_not_import(registry):
+    assert list(registry.keys()) == ["RGB to HSV", "HSV to RGB", "None"]
+    assert "HSV to RGB" in registry
+    assert "Unknown" not in registry
+    assert len(registry) == 3
+    assert LAZY_MODULE not in sys.modules
+
+
+def test_lazy_registry_values(registry):
+    values = list(registry.values())
+    module = sys.modules[LAZY_MODULE]
+    assert values == [module.rgb_to_hsv, module.hsv_to_rgb, None]
+
+
+def test_lazy_registry_none_entry(registry):
+    assert registry["None"] is None
+
+
+def test_lazy_registry_unknown_key(registry):
+    with pytest.raises(KeyError):
+        _ = registry["Unknown"]
+
+
+def test_robots_registry():
+    assert ROBOTS["Default"] is None
+    assert ROBOTS["H1"] is H1
+    with pytest.raises(KeyError):
+        _ = ROBOTS["Unknown"]
@@ -0,0 +1,116 @@
+"""Test VR input handling and math helpers."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from pyquaternion import Quaternion
+from xr import Quaternionf, Vector3f, Posef
+
+from vr.viewer import xr_input
+from vr.viewer.control_profiles.h1_floating import H1Floating
+from vr.viewer.controller import ControllerState
+from vr.viewer.pyopenxr_to_mujoco_converter import (
+    quaternion_from_pyopenxr,
+    vector_from_pyopenxr,
+)
+from vr.viewer.xr_input import XRInput
+
+SEED = 42
+SAMPLES = 100
+# 90-degree rotation along the X-axis converting pyopenxr space to mujoco space
+XR_TO_MUJOCO = Quaternion(axis=[1, 0, 0], angle=np.pi / 2)
+FLOAT_ACTION_VALUE = 0.5
+
+
+def random_quaternions() -> list[Quaternion]:
+    rng = np.random.default_rng(SEED)
+    return [Quaternion(q).normalised for q in rng.normal(size=(SAMPLES, 4))]
+
+
+@pytest.mark.parametrize("quat", random_quaternions())
+def test_quaternion_from_pyopenxr(quat: Quaternion):
+    w, x, y, z = quat.elements
+    expected = (XR_TO_MUJOCO * quat * XR_TO_MUJOCO.inverse).elements
+    assert_allclose(
+        quaternion_from_pyopenxr(Quaternionf(x, y, z, w)), expected, atol=1e-6
+    )
+    assert_allclose(
+        quaternion_from_pyopenxr(np.array([x, y, z, w])), expected, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("quat", random_quaternions())
+def test_quaternion_from_pyopenxr_rotates_converted_vectors(quat: Quaternion):
+    w, x, y, z = quat.elements
+    vector = np.array([0.1, 0.2, 0.3])
+    mujoco_quat = Quaternion(quaternion_from_pyopenxr(Quaternionf(x, y, z, w)))
+    assert_allclose(
+        mujoco_quat.rotate(vector_from_pyopenxr(Vector3f(*vector))),
+        vector_from_pyopenxr(quat.rotate(vector)),
+        atol=1e-6,
+    )
+
+
+@pytest.mark.parametrize("quat", random_quaternions())
+def test_quaternion_to_rpy(quat: Quaternion):
+    yaw, pitch, roll = quat.yaw_pitch_roll
+    assert_allclose(
+        H1Floating._quaternion_to_rpy(quat.elements), [roll, pitch, yaw], atol=1e-9
+    )
+    # Non-normalized quaternions describe the same rotation
+    assert_allclose(
+        H1Floating._quaternion_to_rpy(2 * quat.elements), [roll, pitch, yaw], atol=1e-9
+    )
+
+
+@pytest.fixture
+def xr_input_stub(monkeypatch) -> XRInput:
+    """XRInput with pyopenxr calls replaced by active controllers."""
+    monkeypatch.setattr(xr_input, "sync_actions", lambda **_: None)
+    monkeypatch.setattr(XRInput, "update_views", lambda *_: None)
+    monkeypatch.setattr(XRInput, "_get_action_state_pose", lambda *_: True)
+    monkeypatch.setattr(XRInput, "_get_action_state_bool", lambda *_: True)
+    monkeypatch.setattr(
+        XRInput, "_get_action_state_float", lambda *_: FLOAT_ACTION_VALUE
+    )
+    monkeypatch.setattr(XRInput, "_get_space_pose", lambda *_: Posef())
+    monkeypatch.setattr(XRInput, "_apply_vibration", lambda *_: None)
+
+    stub = XRInput.__new__(XRInput)
+    stub._context = SimpleNamespace(session=None)
+    stub._sync_info = None
+    stub._state = [ControllerState(), ControllerState()]
+    stub._focused = True
+    stub._last_update_time = None
+    stub._pending_vibrations = set()
+    stub.action_pose = None
+    stub.grip_spaces = (None, None)
+    stub.aim_spaces = (None, None)
+    stub._button_actions = ((xr_input.A_BUTTON, None),)
+    stub._float_actions = (
+        ("trigger_value", None),
+        ("thumbstick_x", None),
+        ("thumbstick_y", None),
+    )
+    return stub
+
+
+def test_unfocused_input_is_reset(xr_input_stub: XRInput):
+    xr_input_stub.update(1)
+    for state in xr_input_stub.state:
+        assert state.is_active
+        assert state.a_clicked
+        assert state.trigger_value == FLOAT_ACTION_VALUE
+        assert state.thumbstick_x == FLOAT_ACTION_VALUE
+        assert state.thumbstick_y == FLOAT_ACTION_VALUE
+
+    xr_input_stub.set_focused(False)
+    xr_input_stub.update(2)
+    for state in xr_input_stub.state:
+        assert not state.is_active
+        assert not state.a_click
+        assert not state.a_changed
+        assert state.trigger_value == 0
+        assert state.thumbstick_x == 0
+        assert state.thumbstick_y == 0
@@ -1,15 +1,15 @@
 """Demo Player GUI."""
+import json
 import multiprocessing
 import warnings
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Optional, Union
 
 import glfw
-import numpy as np
 from dearpygui import dearpygui as dpg
 
-from bigym.bigym_env import CONTROL_FREQUENCY_MAX, CONTROL_FREQUENCY_MIN
+from bigym.bigym_env import BiGymEnv, CONTROL_FREQUENCY_MAX, CONTROL_FREQUENCY_MIN
 from bigym.const import CACHE_PATH
 from demonstrations.demo import Demo, DemoStep
 from demonstrations.demo_store import DemoStore
@@ -21,7 +21,7 @@ from tools.shared.utils import (
 from demonstrations.demo_converter import DemoConverter
 
 
-@dataclass
+@dataclass(slots=True)
 class DemosTableRow:
     """Demos table row."""
 
@@ -36,20 +36,15 @@ class DemosTableRow:
 class DemosTable:
     """Demos Table."""
 
+    # Shared between all tables, built on first use
+    _TABLE_THEME: Optional[Union[int, str]] = None
+
     def __init__(self):
         """Init."""
         self._rows: list[DemosTableRow] = []
 
-        with dpg.theme() as table_theme:
-            with dpg.theme_component(dpg.mvTable):
-                dpg.add_theme_color(
-                    dpg.mvThemeCol_HeaderActive,
-                    (0, 0, 0, 0),
-                    category=dpg.mvThemeCat_Core,
-                )
-                dpg.add_theme_color(
-                    dpg.mvThemeCol_Header, (0, 0, 0, 0), category=dpg.mvThemeCat_Core
-                )
+        if DemosTable._TABLE_THEME is None:
+            DemosTable._TABLE_THEME = self._build_theme()
 
         with dpg.child_window(height=400):
             with dpg.table(tag="SelectRows", header_row=True) as self._table:
@@ -80,7 +75,21 @@ class DemosTable:
                     width=100,
                     init_width_or_weight=100,
                 )
-                dpg.bind_item_theme(self._table, table_theme)
+                dpg.bind_item_theme(self._table, DemosTable._TABLE_THEME)
+
+    @staticmethod
+    def _build_theme() -> Union[int, str]:
+        with dpg.theme() as table_theme:
+            with dpg.theme_component(dpg.mvTable):
+                dpg.add_theme_color(
+                    dpg.mvThemeCol_HeaderActive,
+                    (0, 0, 0, 0),
+                    category=dpg.mvThemeCat_Core,
+                )
+                dpg.add_theme_color(
+                    dpg.mvThemeCol_Header, (0, 0, 0, 0), category=dpg.mvThemeCat_Core
+                )
+        return table_theme
 
     def populate(self, demo_files: list[Path]):
         """Fill table."""
@@ -116,7 +125,7 @@ class DemosTable:
             return
         dpg.set_item_label(row.termination_col, str(termination))
         dpg.set_item_label(row.reward_col, f"{reward:.2f}")
-        dpg.set_item_label(row.stable_col, f"{int(np.round(stability * 100))}%")
+        dpg.set_item_label(row.stable_col, f"{round(stability * 100)}%")
         dpg.set_value(row.checkbox, select)
 
     def _add_row(self, demo_file: Path):
@@ -185,7 +194,10 @@ class DemoPlayerWindow(BaseWindow):
         """Init."""
         self._validation_processes: list[multiprocessing.Process] = []
         self._is_playing = False
-        self._current_dir_value = CACHE_PATH
+        self._current_dir_value: Optional[Path] = None
+        self._current_dir_valid = False
+        self._current_dir = CACHE_PATH
+        self._env_cache: dict[tuple, BiGymEnv] = {}
         super().__init__()
 
     def _setup_ui(self):
@@ -221,6 +233,9 @@ class DemoPlayerWindow(BaseWindow):
     def on_close(self):
         """See base."""
         self._stop_demo_replay()
+        for env in self._env_cache.values():
+            env.close()
+        self._env_cache.clear()
 
     def _stop_demo_replay(self):
         """Stop active demo replay."""
@@ -242,36 +257,52 @@ class DemoPlayerWindow(BaseWindow):
         self._run_env(demo)
         # ToDo: Add visual observations replay
 
+    def _get_env(self, demo: Demo, frequency: int) -> BiGymEnv:
+        """Get cached environment matching the demo or create a new one."""
+        env_data = json.dumps(asdict(demo.metadata.environment_data), sort_keys=True)
+        key = (env_data, frequency)
+        env = self._env_cache.get(key)
+        if env is None:
+            env = demo.metadata.get_env(frequency, "human")
+            self._env_cache[key] = env
+        return env
+
     def _run_env(self, demo: Demo):
         frequency = self._get_frequency()
-        env = demo.metadata.get_env(frequency, "human")
+        env = self._get_env(demo, frequency)
         demo = DemoConverter.decimate(demo, frequency, robot=env.robot)
         demo_renderer = DemoPlayerRenderer(env.mojo)
         env.mujoco_renderer = demo_renderer
 
+        def close_renderer():
+            # Environment is kept in cache, only the viewer is released
+            demo_renderer.close()
+            env.mujoco_renderer = None
+
         def render() -> bool:
             if (
                 not self._is_playing
                 or demo_renderer.viewer.window is None
                 or glfw.window_should_close(demo_renderer.viewer.window)
             ):
-                env.close()
+                close_renderer()
                 self._stop_demo_replay()
                 return False
             else:
                 env.render()
                 return True
 
+        timesteps = demo.timesteps
         while True:
             env.reset(seed=int(demo.seed))
-            for timestep in demo.timesteps:
+            for timestep in timesteps:
                 try:
                     actual_timestep = DemoStep(
                         *env.step(timestep.executed_action), timestep.executed_action
                     )
                 except ValueError as e:
                     warnings.warn(str(e))
-                    env.close()
+                    close_renderer()
                     self._stop_demo_replay()
                     return
                 demo_renderer.set_demo_data(
@@ -281,6 +312,7 @@ class DemoPlayerWindow(BaseWindow):
                     return
 
     def _select_directory_callback(self):
+        self._refresh_current_dir()
         self._select_directory(self._current_dir or "", self._on_directory_selected)
 
     def _on_directory_selected(self, selected_path: Path):
@@ -313,13 +345,15 @@ class DemoPlayerWindow(BaseWindow):
 
     @property
     def _current_dir(self) -> Optional[Path]:
-        if self._current_dir_value:
-            if not isinstance(self._current_dir_value, Path):
-                self._current_dir_value = Path(self._current_dir_value)
-            if self._current_dir_value.exists():
-                return self._current_dir_value
-        return None
+        return self._current_dir_value if self._current_dir_valid else None
 
     @_current_dir.setter
     def _current_dir(self, value):
-        self._current_dir_value = value
+        self._current_dir_value = Path(value) if value else None
+        self._refresh_current_dir()
+
+    def _refresh_current_dir(self):
+        """Re-validate current directory, path is checked only on change."""
+        self._current_dir_valid = (
+            self._current_dir_value is not None and self._current_dir_value.exists()
+        )
@@ -1,66 +1,21 @@
 """Shared entities."""
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
 from enum import Enum
+from importlib import import_module
 from pathlib import Path
-from typing import Type, Union, Callable, Optional
-
-from bigym.bigym_env import BiGymEnv
-from bigym.envs.cupboards import (
-    DrawerTopOpen,
-    DrawerTopClose,
-    DrawersAllOpen,
-    DrawersAllClose,
-    CupboardsCloseAll,
-    CupboardsOpenAll,
-    WallCupboardOpen,
-    WallCupboardClose,
-)
-from bigym.envs.dishwasher import (
-    DishwasherOpen,
-    DishwasherClose,
-    DishwasherOpenTrays,
-    DishwasherCloseTrays,
-)
-from bigym.envs.dishwasher_cups import (
-    DishwasherUnloadCups,
-    DishwasherLoadCups,
-    DishwasherUnloadCupsLong,
-)
-from bigym.envs.dishwasher_cutlery import (
-    DishwasherUnloadCutlery,
-    DishwasherLoadCutlery,
-    DishwasherUnloadCutleryLong,
-)
-from bigym.envs.dishwasher_plates import (
-    DishwasherUnloadPlates,
-    DishwasherLoadPlates,
-    DishwasherUnloadPlatesLong,
-)
-from bigym.envs.groceries import GroceriesStoreLower, GroceriesStoreUpper
-from bigym.envs.manipulation import FlipCup, FlipCutlery, StackBlocks
-from bigym.envs.move_plates import MovePlate, MoveTwoPlates
-from bigym.envs.pick_and_place import (
-    TakeCups,
-    PutCups,
-    PickBox,
-    StoreBox,
-    SaucepanToHob,
-    StoreKitchenware,
-    ToastSandwich,
-    FlipSandwich,
-    RemoveSandwich,
-)
-from bigym.envs.reach_target import ReachTarget, ReachTargetDual, ReachTargetSingle
-from bigym.robots.robot import Robot
-from bigym.robots.configs.google_robot import GoogleRobot
-from bigym.robots.configs.h1 import H1, H1FineManipulation
-from bigym.robots.configs.stretch import StretchRobot
+from typing import Type, Union, Callable, Optional, TYPE_CHECKING, Iterator, Any
+
 from demonstrations.const import SAFETENSORS_SUFFIX
 
 from dearpygui import dearpygui as dpg
 
-from vr.viewer.control_profiles.control_profile import ControlProfile
-from vr.viewer.control_profiles.h1_floating import H1Floating
-from vr.viewer.control_profiles.universal_floating import UniversalFloating
+if TYPE_CHECKING:
+    from bigym.bigym_env import BiGymEnv
+    from bigym.robots.robot import Robot
+    from vr.viewer.control_profiles.control_profile import ControlProfile
 
 
 class ReplayMode(Enum):
@@ -70,72 +25,160 @@ class ReplayMode(Enum):
     Delta = 1
 
 
+class LazyRegistry(Mapping):
+    """Read-only mapping importing registered objects on first access.
+
+    Avoids importing every registered class when only one of them is used.
+    """
+
+    def __init__(self, paths: dict[str, Optional[tuple[str, str]]]):
+        """Init.
+
+        Args:
+            paths: Mapping of names to (module, attribute) pairs or None.
+        """
+        self._paths = paths
+        self._resolved: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        """Get registered object, importing it on first access."""
+        if key not in self._resolved:
+            path = self._paths[key]
+            if path is None:
+                value = None
+            else:
+                module_name, attribute = path
+                value = getattr(import_module(module_name), attribute)
+            self._resolved[key] = value
+        return self._resolved[key]
+
+    def __contains__(self, key: object) -> bool:
+        """Check if name is registered without importing it."""
+        return key in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over registered names."""
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        """Get number of registered entries."""
+        return len(self._paths)
+
+
 REPLAY_MODES: dict[str, ReplayMode] = {
     "Absolute": ReplayMode.Absolute,
     "Delta": ReplayMode.Delta,
 }
 
-ENVIRONMENTS: dict[str, Type[BiGymEnv]] = {
-    "Reach Target": ReachTarget,
-    "Reach Target Single": ReachTargetSingle,
-    "Reach Target Dual": ReachTargetDual,
-    "Stack Blocks": StackBlocks,
-    "Move Plate": MovePlate,
-    "Move Two Plates": MoveTwoPlates,
-    "Dishwasher Open": DishwasherOpen,
-    "Dishwasher Close": DishwasherClose,
-    "Dishwasher Open Trays": DishwasherOpenTrays,
-    "Dishwasher Close Trays": DishwasherCloseTrays,
-    "Dishwasher Unload Plates": DishwasherUnloadPlates,
-    "Dishwasher Unload Plates Long": DishwasherUnloadPlatesLong,
-    "Dishwasher Load Plates": DishwasherLoadPlates,
-    "Dishwasher Unload Cutlery": DishwasherUnloadCutlery,
-    "Dishwasher Unload Cutlery Long": DishwasherUnloadCutleryLong,
-    "Dishwasher Load Cutlery": DishwasherLoadCutlery,
-    "Dishwasher Unload Cups": DishwasherUnloadCups,
-    "Dishwasher Unload Cups Long": DishwasherUnloadCupsLong,
-    "Dishwasher Load Cups": DishwasherLoadCups,
-    "Drawer Top Open": DrawerTopOpen,
-    "Drawer Top Close": DrawerTopClose,
-    "Drawers All Open": DrawersAllOpen,
-    "Drawers All Close": DrawersAllClose,
-    "Wall Cupboard Open": WallCupboardOpen,
-    "Wall Cupboard  Close": WallCupboardClose,
-    "Cupboards Open All": CupboardsOpenAll,
-    "Cupboards Close All": CupboardsCloseAll,
-    "Take Cups": TakeCups,
-    "Put Cups": PutCups,
-    "Flip Cup": FlipCup,
-    "Flip Cutlery": FlipCutlery,
-    "Pick Box": PickBox,
-    "Store Box": StoreBox,
-    "Saucepan To Hob": SaucepanToHob,
-    "Store Kitchenware": StoreKitchenware,
-    "Toast Sandwich": ToastSandwich,
-    "Flip Sandwich": FlipSandwich,
-    "Remove Sandwich": RemoveSandwich,
-    "Groceries Store Lower": GroceriesStoreLower,
-    "Groceries Store Upper": GroceriesStoreUpper,
-}
+ENVIRONMENTS: Mapping[str, Type[BiGymEnv]] = LazyRegistry(
+    {
+        "Reach Target": ("bigym.envs.reach_target", "ReachTarget"),
+        "Reach Target Single": ("bigym.envs.reach_target", "ReachTargetSingle"),
+        "Reach Target Dual": ("bigym.envs.reach_target", "ReachTargetDual"),
+        "Stack Blocks": ("bigym.envs.manipulation", "StackBlocks"),
+        "Move Plate": ("bigym.envs.move_plates", "MovePlate"),
+        "Move Two Plates": ("bigym.envs.move_plates", "MoveTwoPlates"),
+        "Dishwasher Open": ("bigym.envs.dishwasher", "DishwasherOpen"),
+        "Dishwasher Close": ("bigym.envs.dishwasher", "DishwasherClose"),
+        "Dishwasher Open Trays": ("bigym.envs.dishwasher", "DishwasherOpenTrays"),
+        "Dishwasher Close Trays": ("bigym.envs.dishwasher", "DishwasherCloseTrays"),
+        "Dishwasher Unload Plates": (
+            "bigym.envs.dishwasher_plates",
+            "DishwasherUnloadPlates",
+        ),
+        "Dishwasher Unload Plates Long": (
+            "bigym.envs.dishwasher_plates",
+            "DishwasherUnloadPlatesLong",
+        ),
+        "Dishwasher Load Plates": (
+            "bigym.envs.dishwasher_plates",
+            "DishwasherLoadPlates",
+        ),
+        "Dishwasher Unload Cutlery": (
+            "bigym.envs.dishwasher_cutlery",
+            "DishwasherUnloadCutlery",
+        ),
+        "Dishwasher Unload Cutlery Long": (
+            "bigym.envs.dishwasher_cutlery",
+            "DishwasherUnloadCutleryLong",
+        ),
+        "Dishwasher Load Cutlery": (
+            "bigym.envs.dishwasher_cutlery",
+            "DishwasherLoadCutlery",
+        ),
+        "Dishwasher Unload Cups": (
+            "bigym.envs.dishwasher_cups",
+            "DishwasherUnloadCups",
+        ),
+        "Dishwasher Unload Cups Long": (
+            "bigym.envs.dishwasher_cups",
+            "DishwasherUnloadCupsLong",
+        ),
+        "Dishwasher Load Cups": ("bigym.envs.dishwasher_cups", "DishwasherLoadCups"),
+        "Drawer Top Open": ("bigym.envs.cupboards", "DrawerTopOpen"),
+        "Drawer Top Close": ("bigym.envs.cupboards", "DrawerTopClose"),
+        "Drawers All Open": ("bigym.envs.cupboards", "DrawersAllOpen"),
+        "Drawers All Close": ("bigym.envs.cupboards", "DrawersAllClose"),
+        "Wall Cupboard Open": ("bigym.envs.cupboards", "WallCupboardOpen"),
+        "Wall Cupboard  Close": ("bigym.envs.cupboards", "WallCupboardClose"),
+        "Cupboards Open All": ("bigym.envs.cupboards", "CupboardsOpenAll"),
+        "Cupboards Close All": ("bigym.envs.cupboards", "CupboardsCloseAll"),
+        "Take Cups": ("bigym.envs.pick_and_place", "TakeCups"),
+        "Put Cups": ("bigym.envs.pick_and_place", "PutCups"),
+        "Flip Cup": ("bigym.envs.manipulation", "FlipCup"),
+        "Flip Cutlery": ("bigym.envs.manipulation", "FlipCutlery"),
+        "Pick Box": ("bigym.envs.pick_and_place", "PickBox"),
+        "Store Box": ("bigym.envs.pick_and_place", "StoreBox"),
+        "Saucepan To Hob": ("bigym.envs.pick_and_place", "SaucepanToHob"),
+        "Store Kitchenware": ("bigym.envs.pick_and_place", "StoreKitchenware"),
+        "Toast Sandwich": ("bigym.envs.pick_and_place", "ToastSandwich"),
+        "Flip Sandwich": ("bigym.envs.pick_and_place", "FlipSandwich"),
+        "Remove Sandwich": ("bigym.envs.pick_and_place", "RemoveSandwich"),
+        "Groceries Store Lower": ("bigym.envs.groceries", "GroceriesStoreLower"),
+        "Groceries Store Upper": ("bigym.envs.groceries", "GroceriesStoreUpper"),
+    }
+)
 
-ROBOTS: dict[str, Optional[Type[Robot]]] = {
-    "Default": None,
-    "H1": H1,
-    "H1 Fine Manipulation": H1FineManipulation,
-    "Google Robot": GoogleRobot,
-    "Stretch Robot": StretchRobot,
-}
+ROBOTS: Mapping[str, Optional[Type[Robot]]] = LazyRegistry(
+    {
+        "Default": None,
+        "H1": ("bigym.robots.configs.h1", "H1"),
+        "H1 Fine Manipulation": ("bigym.robots.configs.h1", "H1FineManipulation"),
+        "Google Robot": ("bigym.robots.configs.google_robot", "GoogleRobot"),
+        "Stretch Robot": ("bigym.robots.configs.stretch", "StretchRobot"),
+    }
+)
 
-CONTROL_PROFILES: dict[str, Type[ControlProfile]] = {
-    "H1 Upper Body Floating": H1Floating,
-    "Universal": UniversalFloating,
-}
+CONTROL_PROFILES: Mapping[str, Type[ControlProfile]] = LazyRegistry(
+    {
+        "H1 Upper Body Floating": (
+            "vr.viewer.control_profiles.h1_floating",
+            "H1Floating",
+        ),
+        "Universal": (
+            "vr.viewer.control_profiles.universal_floating",
+            "UniversalFloating",
+        ),
+    }
+)
 
 
 def get_demos_in_dir(directory: Path) -> list[Path]:
-    """Get all demonstrations files in directory."""
-    demos = list(directory.glob(f"*{SAFETENSORS_SUFFIX}"))
-    return sorted(demos)
+    """Get all demonstrations files in directory.
+
+    Missing directories and file paths yield no demonstrations.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            demos = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(SAFETENSORS_SUFFIX) and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    demos.sort()
+    return demos
 
 
 def select_directory(default_path: Union[Path, str], callback: Callable[[Path], None]):
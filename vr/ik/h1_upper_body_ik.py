@@ -1,12 +1,11 @@
 """H1 upper body IK solver."""
+import math
 from dataclasses import dataclass, field
 
-import mujoco
 import numpy as np
 from dm_control import mjcf
 from lxml import etree
 from mujoco_utils import mjcf_utils, physics_utils, collision_utils
-from pyquaternion import Quaternion
 
 from bigym.bigym_env import BiGymEnv
 from bigym.const import (
@@ -25,7 +24,15 @@ KP = 1000
 KV = 2 * np.sqrt(KP)
 JOINT_DAMPING = KP / 200
 RANGE_EE_POSITION = (-5, 5)
+# Gear of X, Y and Z end effector actuators, translation only
+EE_GEARS = (
+    (1, 0, 0, 0, 0, 0),
+    (0, 1, 0, 0, 0, 0),
+    (0, 0, 1, 0, 0, 0),
+)
 SOLVER_MAX_STEPS = 40
+SOLVER_STEPS_CHUNK = 5
+SOLVER_TOLERANCE = 1e-3
 WRIST_ANGLE_SCALE = 2
 TIMESTEP_FACTOR = 10
 
@@ -37,10 +44,10 @@ JOINT_LIMITS = {
 
 @dataclass
 class Pose:
-    """Pose represented by np.ndarray and Quaternion."""
+    """Pose represented by position and (w, x, y, z) quaternion arrays."""
 
     position: np.ndarray = field(default_factory=lambda: np.zeros(3))
-    orientation: Quaternion = Quaternion()
+    orientation: np.ndarray = field(default_factory=lambda: np.array([1.0, 0, 0, 0]))
 
 
 # ToDO: add abstract IK class
@@ -78,7 +85,6 @@ class H1UpperBodyIK:
                 pass
 
         # Fix pelvis
-        _all = mjcf_utils.safe_find_all(self._model, "body")
         self._pelvis = mjcf_utils.safe_find(self._model, "body", PELVIS_NAME)
         if self._pelvis.freejoint:
             self._pelvis.freejoint.remove()
@@ -149,10 +155,18 @@ class H1UpperBodyIK:
 
         self._physics = mjcf.Physics.from_mjcf_model(self._model)
         self._physics.model.opt.timestep *= TIMESTEP_FACTOR
-
-        for body in mjcf_utils.safe_find_all(self._model, "body"):
-            body = self._physics.bind(body)
-            body.inertia *= 0
+        self._physics.model.body_inertia[:] = 0
+
+        # Bindings are static, cache them to avoid lookups on every solve
+        self._arm_joints_bound = self._physics.bind(self._arm_joints)
+        self._pelvis_bound = self._physics.bind(self._pelvis)
+        self._actuators_left_bound = self._physics.bind(self._actuators_left)
+        self._actuators_right_bound = self._physics.bind(self._actuators_right)
+        self._left_arm_site_bound = self._physics.bind(self._left_arm_site)
+        self._right_arm_site_bound = self._physics.bind(self._right_arm_site)
+        self._qpos = np.zeros(len(self._arm_joints))
+        # Arm joints of both sides followed by corresponding wrist angles
+        self._solution = np.zeros(len(self._arm_joints) + 2)
 
     def solve(
         self,
@@ -163,44 +177,53 @@ class H1UpperBodyIK:
         target_pose_right: Pose,
     ) -> np.ndarray:
         """Solve IK."""
-        arm_joints = self._physics.bind(self._arm_joints)
-        qpos = np.concatenate((qpos_arm_left[:-1], qpos_arm_right[:-1]))
-        arm_joints.qpos = qpos
-        arm_joints.qvel = np.zeros_like(qpos)
-        arm_joints.qacc = np.zeros_like(qpos)
+        arm_joints = self._arm_joints_bound
+        left_count = len(qpos_arm_left) - 1
+        self._qpos[:left_count] = qpos_arm_left[:-1]
+        self._qpos[left_count:] = qpos_arm_right[:-1]
+        arm_joints.qpos = self._qpos
+        arm_joints.qvel = 0
+        arm_joints.qacc = 0
 
         # Solve position
-        self._physics.bind(self._pelvis).pos = pelvis_pose.position
-        self._physics.bind(self._pelvis).quat = pelvis_pose.orientation.elements
-
-        self._physics.bind(self._actuators_left).ctrl = target_pose_left.position
-        self._physics.bind(self._actuators_right).ctrl = target_pose_right.position
-
-        self._physics.step(SOLVER_MAX_STEPS)
-
-        # Cache orientation
-        left_site_quat = self._get_site_quaternion(self._left_arm_site)
-        right_site_quat = self._get_site_quaternion(self._right_arm_site)
-
-        # Solve orientation
-        y = np.array([0, 1, 0])
-        z = np.array([0, 0, 1])
-        left_up = target_pose_left.orientation.rotate(z)
-        right_up = target_pose_right.orientation.rotate(z)
-        left_site_up = left_site_quat.rotate(y)
-        right_site_up = right_site_quat.rotate(y)
+        self._pelvis_bound.pos = pelvis_pose.position
+        self._pelvis_bound.quat = pelvis_pose.orientation
+
+        self._actuators_left_bound.ctrl = target_pose_left.position
+        self._actuators_right_bound.ctrl = target_pose_right.position
+
+        for _ in range(0, SOLVER_MAX_STEPS, SOLVER_STEPS_CHUNK):
+            self._physics.step(SOLVER_STEPS_CHUNK)
+            if self._is_position_converged(
+                target_pose_left.position, target_pose_right.position
+            ):
+                break
+
+        # Solve orientation, site up axis is the 2nd column of row-major xmat
+        left_wrist = _wrist_angle(
+            self._left_arm_site_bound.xmat[1::3],
+            _quaternion_z_axis(target_pose_left.orientation),
+        )
+        right_wrist = _wrist_angle(
+            self._right_arm_site_bound.xmat[1::3],
+            _quaternion_z_axis(target_pose_right.orientation),
+        )
 
-        left_wrist = np.arccos(np.dot(left_site_up, left_up)) - np.pi / 2
-        left_wrist = np.clip(left_wrist * WRIST_ANGLE_SCALE, -np.pi / 2, np.pi / 2)
-        right_wrist = np.arccos(np.dot(right_site_up, right_up)) - np.pi / 2
-        right_wrist = np.clip(right_wrist * WRIST_ANGLE_SCALE, -np.pi / 2, np.pi / 2)
+        qpos = arm_joints.qpos
+        self._solution[:left_count] = qpos[:left_count]
+        self._solution[left_count] = left_wrist
+        self._solution[left_count + 1 : -1] = qpos[left_count:]
+        self._solution[-1] = right_wrist
 
-        solution = np.array(self._physics.bind(self._arm_joints).qpos)
-        left_solution, right_solution = np.split(solution, 2)
-        left_solution = np.append(left_solution, left_wrist)
-        right_solution = np.append(right_solution, right_wrist)
+        # Solution is consumed on another thread, don't expose internal buffer
+        return self._solution.copy()
 
-        return np.concatenate((left_solution, right_solution))
+    def _is_position_converged(
+        self, target_left: np.ndarray, target_right: np.ndarray
+    ) -> bool:
+        left_error = np.linalg.norm(self._left_arm_site_bound.xpos - target_left)
+        right_error = np.linalg.norm(self._right_arm_site_bound.xpos - target_right)
+        return left_error < SOLVER_TOLERANCE and right_error < SOLVER_TOLERANCE
 
     def _generate_ee_actuators(self, site: str, origin: str):
         x = self._model.actuator.add(
@@ -227,15 +250,21 @@ class H1UpperBodyIK:
         )
 
         actuators = [x, y, z]
-        for index, actuator in enumerate(actuators):
-            actuator.gear = np.zeros(6)
-            actuator.gear[index] = 1
+        for actuator, gear in zip(actuators, EE_GEARS):
+            actuator.gear = gear
             actuator.site = site
             actuator.refsite = origin
         return actuators
 
-    def _get_site_quaternion(self, site: mjcf.Element) -> Quaternion:
-        bound_site = self._physics.bind(site)
-        quat = np.zeros(4)
-        mujoco.mju_mat2Quat(quat, bound_site.xmat)
-        return Quaternion(quat)
+
+def _quaternion_z_axis(quat: np.ndarray) -> np.ndarray:
+    """Rotate unit Z-axis by a unit quaternion (w, x, y, z)."""
+    w, x, y, z = quat
+    return np.array([2 * (x * z + w * y), 2 * (y * z - w * x), 1 - 2 * (x * x + y * y)])
+
+
+def _wrist_angle(site_up: np.ndarray, target_up: np.ndarray) -> float:
+    """Get wrist angle aligning site up axis with target up axis."""
+    cos_angle = min(1.0, max(-1.0, float(np.dot(site_up, target_up))))
+    angle = (math.acos(cos_angle) - np.pi / 2) * WRIST_ANGLE_SCALE
+    return min(np.pi / 2, max(-np.pi / 2, angle))
@@ -1,9 +1,9 @@
 """Abstract base class for defining control profiles."""
 from abc import ABC, abstractmethod
 
+import mujoco
 import numpy as np
 from gymnasium.core import ActType
-from pyquaternion import Quaternion
 from xr import Posef
 
 from bigym.bigym_env import BiGymEnv
@@ -43,21 +43,38 @@ class ControlProfile(ABC):
         """Custom reset behaviour, called on environment reset."""
         pass
 
+    def close(self):
+        """Release resources, called when VR viewer stops."""
+        pass
+
+    def _get_floating_base_masks(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get masks of actuated floating base position and rotation axes."""
+        floating_base = self._env.robot.floating_base
+        position_mask = np.array(
+            [actuator is not None for actuator in floating_base.position_actuators]
+        )
+        rotation_mask = np.array(
+            [actuator is not None for actuator in floating_base.rotation_actuators]
+        )
+        return position_mask, rotation_mask
+
     @staticmethod
     def _get_controller_pose(
         context: XRContextObject, side: Side, offset: Posef
-    ) -> tuple[np.ndarray, Quaternion]:
-        pose = context.input.state[side].pose_aim
-        pos = vector_from_pyopenxr(pose.position) + offset.position.as_numpy()
-        quat = Quaternion(quaternion_from_pyopenxr(pose.orientation))
+    ) -> tuple[np.ndarray, np.ndarray]:
+        pose = context.input.state[side].pose_aim_array
+        pos = vector_from_pyopenxr(pose[4:]) + offset.position.as_numpy()
+        quat = quaternion_from_pyopenxr(pose[:4])
         return pos, quat
 
     @staticmethod
     def _get_hmd_pose(
         context: XRContextObject, offset: Posef, pivot_offset: np.ndarray = np.zeros(3)
-    ) -> tuple[np.ndarray, Quaternion]:
+    ) -> tuple[np.ndarray, np.ndarray]:
         pose = context.input.hmd_pose
-        quat = Quaternion(quaternion_from_pyopenxr(pose.orientation))
+        quat = quaternion_from_pyopenxr(pose.orientation)
         pos = vector_from_pyopenxr(pose.position) + offset.position.as_numpy()
-        pos += quat.rotate(pivot_offset)
+        rotated_pivot_offset = np.zeros(3)
+        mujoco.mju_rotVecQuat(rotated_pivot_offset, pivot_offset, quat)
+        pos += rotated_pivot_offset
         return pos, quat
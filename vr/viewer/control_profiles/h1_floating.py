@@ -1,5 +1,10 @@
 """Control profile to for H1 in floating mode."""
+import math
+import queue
+import threading
+from typing import Optional
 
+import mujoco
 import numpy as np
 from gymnasium.core import ActType
 from pyquaternion import Quaternion
@@ -20,6 +25,7 @@ class H1Floating(ControlProfile):
         - Use the right A button to enable/disable synchronization of position.
         - Use the right B button to enable/disable synchronization of rotation.
         - Position of controllers is used as the target for the corresponding arm of H1.
+        - IK is solved on a worker thread, arms follow targets with one frame latency.
     """
 
     POSITION_SMOOTHING = 0.01
@@ -28,6 +34,8 @@ class H1Floating(ControlProfile):
     HMD_TO_PELVIS_OFFSET = 0.7
     HMD_PIVOT_OFFSET = np.array([0, -0.2, 0])
 
+    _PELVIS_ROT_OFFSET = Quaternion(axis=[0, 0, 1], angle=np.pi / 2).elements
+
     def __init__(self, env: BiGymEnv):
         """Init."""
         super().__init__(env)
@@ -35,10 +43,41 @@ class H1Floating(ControlProfile):
         self._sync_rotation = True
         self._ik = H1UpperBodyIK(env)
 
+        # Only the latest IK request is kept, stale targets are dropped,
+        # None stops the worker
+        self._ik_requests: queue.Queue[Optional[tuple[int, dict]]] = queue.Queue(
+            maxsize=1
+        )
+        self._ik_solution: Optional[np.ndarray] = None
+        self._ik_error: Optional[Exception] = None
+        # Solutions of requests made before the last reset are discarded
+        self._ik_generation = 0
+        self._ik_lock = threading.Lock()
+        self._ik_thread: Optional[threading.Thread] = None
+        self._start_ik_worker()
+
+        # Quaternion buffers reused every frame
+        self._pelvis_quat_inv = np.zeros(4)
+        self._hmd_to_pelvis_quat = np.zeros(4)
+        self._delta_quat = np.zeros(4)
+        # Action buffer reused every frame, caller clips it into a new array
+        self._control = np.zeros_like(env.action_space.low)
+        self._position_mask, self._rotation_mask = self._get_floating_base_masks()
+        self._base_dofs = int(self._position_mask.sum() + self._rotation_mask.sum())
+
+        # Robot layout is static for the lifetime of the environment
+        self._pelvis = env.robot.pelvis
+        self._arms_slice = slice(
+            self._base_dofs, self._base_dofs + len(env.robot.limb_actuators)
+        )
+
     def get_next_action(
         self, context: XRContextObject, steps_count: int, space_offset: Posef
     ) -> ActType:
         """See base."""
+        if self._ik_error:
+            raise self._ik_error
+
         trigger_left = context.input.state[Side.LEFT].trigger_value
         trigger_right = context.input.state[Side.RIGHT].trigger_value
 
@@ -54,54 +93,104 @@ class H1Floating(ControlProfile):
         if context.input.state[Side.RIGHT].b_clicked:
             self._sync_rotation = not self._sync_rotation
 
-        pelvis = self._env.robot.pelvis
-        pelvis_pose = Pose(pelvis.get_position(), Quaternion(pelvis.get_quaternion()))
+        pelvis_quat = self._pelvis.get_quaternion()
+        pelvis_pose = Pose(np.array(self._pelvis.get_position()), np.array(pelvis_quat))
 
-        delta_pos = np.array(hmd_pos - pelvis_pose.position)
+        delta_pos = hmd_pos - pelvis_pose.position
         delta_pos[2] -= self.HMD_TO_PELVIS_OFFSET
-        magnitude = np.linalg.norm(delta_pos)
-        if magnitude > 1:
-            delta_pos /= magnitude
+        magnitude_squared = delta_pos.dot(delta_pos)
+        if magnitude_squared > 1:
+            delta_pos /= math.sqrt(magnitude_squared)
         delta_pos *= self.POSITION_SMOOTHING * float(self._sync_position)
 
-        delta_quat = (
-            hmd_quat
-            * pelvis_pose.orientation.inverse
-            * Quaternion(axis=[0, 0, 1], angle=np.pi / 2)
+        mujoco.mju_negQuat(self._pelvis_quat_inv, pelvis_quat)
+        mujoco.mju_mulQuat(self._hmd_to_pelvis_quat, hmd_quat, self._pelvis_quat_inv)
+        mujoco.mju_mulQuat(
+            self._delta_quat, self._hmd_to_pelvis_quat, self._PELVIS_ROT_OFFSET
         )
-        delta_ypr = np.flip(np.array(delta_quat.yaw_pitch_roll))
-        delta_ypr *= self.ROTATION_SMOOTHING * float(self._sync_rotation)
+        delta_rpy = self._quaternion_to_rpy(self._delta_quat)
+        delta_rpy *= self.ROTATION_SMOOTHING * float(self._sync_rotation)
 
-        control = np.zeros_like(self._env.action_space.low)
+        control = self._control
+        control[:] = 0
         # Control floating base
-        floating_base = self._env.robot.floating_base
-        base_control = []
-        if floating_base:
-            for delta, actuator in zip(delta_pos, floating_base.position_actuators):
-                if actuator:
-                    base_control.append(delta)
-            for delta, actuator in zip(delta_ypr, floating_base.rotation_actuators):
-                if actuator:
-                    base_control.append(delta)
-            control[: len(base_control)] = base_control
+        control[: self._base_dofs] = np.concatenate(
+            (delta_pos[self._position_mask], delta_rpy[self._rotation_mask])
+        )
 
         # Control arms
-        start_index = floating_base.dof_amount
-        end_index = start_index + len(self._env.robot.limb_actuators)
-
-        arms_qpos = np.array(self._env.robot.qpos_actuated[start_index:end_index])
+        arms_qpos = np.array(self._env.robot.qpos_actuated[self._arms_slice])
         qpos_arm_left, qpos_arm_right = np.split(arms_qpos, 2)
-        solution = self._ik.solve(
+        self._request_ik(
             pelvis_pose=pelvis_pose,
             qpos_arm_left=qpos_arm_left,
             qpos_arm_right=qpos_arm_right,
             target_pose_left=Pose(l_pos, l_quat),
             target_pose_right=Pose(r_pos, r_quat),
         )
-        control[start_index:end_index] = solution
+        # Use solution of the previous request, hold current pose until available
+        solution = self._ik_solution
+        control[self._arms_slice] = arms_qpos if solution is None else solution
 
         # Control grippers
         control[-2] = np.clip(np.round(trigger_left), 0, 1)
         control[-1] = np.clip(np.round(trigger_right), 0, 1)
 
         return control
+
+    def reset(self):
+        """Drop IK requests, solutions and errors of the pre-reset state."""
+        with self._ik_lock:
+            self._ik_generation += 1
+            self._ik_solution = None
+        self._drop_ik_request()
+        if self._ik_error:
+            # Worker stops after a failure, start a new one for the fresh state
+            self._ik_thread.join()
+            self._ik_error = None
+            self._start_ik_worker()
+
+    def close(self):
+        """Stop IK worker."""
+        self._drop_ik_request()
+        self._ik_requests.put_nowait(None)
+        self._ik_thread.join()
+
+    @staticmethod
+    def _quaternion_to_rpy(quat: np.ndarray) -> np.ndarray:
+        # Same z-y'-x'' convention as pyquaternion yaw_pitch_roll, reversed order
+        w, x, y, z = quat / math.sqrt(quat.dot(quat))
+        roll = math.atan2(2 * (w * x - y * z), 1 - 2 * (x * x + y * y))
+        pitch = math.asin(min(max(2 * (w * y + z * x), -1.0), 1.0))
+        yaw = math.atan2(2 * (w * z - x * y), 1 - 2 * (y * y + z * z))
+        return np.array([roll, pitch, yaw])
+
+    def _start_ik_worker(self):
+        self._ik_thread = threading.Thread(target=self._solve_ik_loop, daemon=True)
+        self._ik_thread.start()
+
+    def _drop_ik_request(self):
+        try:
+            self._ik_requests.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _request_ik(self, **ik_kwargs):
+        self._drop_ik_request()
+        self._ik_requests.put_nowait((self._ik_generation, ik_kwargs))
+
+    def _solve_ik_loop(self):
+        while True:
+            request = self._ik_requests.get()
+            if request is None:
+                return
+            generation, ik_kwargs = request
+            try:
+                solution = self._ik.solve(**ik_kwargs)
+            except Exception as e:
+                # Forwarded to the caller thread by get_next_action
+                self._ik_error = e
+                return
+            with self._ik_lock:
+                if generation == self._ik_generation:
+                    self._ik_solution = solution
@@ -2,7 +2,6 @@
 
 import numpy as np
 from gymnasium.core import ActType
-from pyquaternion import Quaternion
 from xr import Posef
 
 from bigym.bigym_env import BiGymEnv
@@ -46,6 +45,9 @@ class UniversalFloating(ControlProfile):
             self._env.robot.floating_base.qpos
         )
 
+        self._position_mask, self._rotation_mask = self._get_floating_base_masks()
+        self._base_dofs = int(self._position_mask.sum() + self._rotation_mask.sum())
+
         self._highlighter = RobotHighlighter(self._env.robot, self._env.mojo)
 
         self._control_base = True
@@ -72,27 +74,22 @@ class UniversalFloating(ControlProfile):
         control = self._env.action
         forward *= self._fwd_delta
         turn *= self._turn_delta
-        pelvis_quat = Quaternion(self._env.robot.pelvis.get_quaternion())
-        delta_position = pelvis_quat.rotate(np.array([forward, 0, 0])) / steps
+        # Rotate forward X-axis by pelvis quaternion
+        w, x, y, z = self._env.robot.pelvis.get_quaternion()
+        delta_position = np.array(
+            [1 - 2 * (y * y + z * z), 2 * (x * y + w * z), 2 * (x * z - w * y)]
+        ) * (forward / steps)
         delta_rotation = np.array([0, 0, turn]) / steps
-        base = self._env.robot.floating_base
-        base_control = []
-        for i, actuator in enumerate(base.position_actuators):
-            if not actuator:
-                continue
-            base_control.append(delta_position[i])
-        for i, actuator in enumerate(base.rotation_actuators):
-            if not actuator:
-                continue
-            base_control.append(delta_rotation[i])
-        control[: len(base_control)] = base_control
+        control[: self._base_dofs] = np.concatenate(
+            (delta_position[self._position_mask], delta_rotation[self._rotation_mask])
+        )
         return control
 
     def _get_joints_control(self, value: float, steps: int) -> np.ndarray:
         # Fix base
         base_dofs = self._env.robot.floating_base.dof_amount
         control = self._env.action
-        control[:base_dofs] = np.zeros(base_dofs)
+        control[:base_dofs] = 0
         # Control selected joint
         control_index = base_dofs + self._joint_index
         is_gripper = ((len(control) - 1) - control_index) < len(
@@ -106,8 +103,8 @@ class UniversalFloating(ControlProfile):
         return control
 
     def _joystick_value(self, value: float) -> float:
-        value = np.clip(value, -1, 1)
-        return value if np.abs(value) >= self._SENS_THRESHOLD else 0
+        value = min(max(value, -1.0), 1.0)
+        return value if abs(value) >= self._SENS_THRESHOLD else 0.0
 
     def _toggle_control_mode(self):
         self._control_base = not self._control_base
@@ -19,6 +19,10 @@ from vr.viewer import Side
 if TYPE_CHECKING:
     from vr.viewer.xr_context import XRContextObject
 
+TRIGGER_BUTTON = 1 << 0
+A_BUTTON = 1 << 1
+B_BUTTON = 1 << 2
+
 CONTROLLER_NOT_ACTIVE_POSITION = np.array([0, 0, -100])
 CONTROLLER_NOT_ACTIVE_ROTATION = np.array(Quaternion().elements)
 
@@ -32,38 +36,78 @@ CONTROLLER_MODELS = {
 class ControllerState:
     """State of the VR Controller."""
 
+    __slots__ = (
+        "is_active",
+        "pose",
+        "pose_aim",
+        "pose_array",
+        "pose_aim_array",
+        "buttons",
+        "buttons_changed",
+        "trigger_value",
+        "thumbstick_x",
+        "thumbstick_y",
+    )
+
     def __init__(self):
         """Init."""
-        # Inputs
         self.is_active: bool = False
         self.pose: Posef = Posef()
         self.pose_aim: Posef = Posef()
-        self.trigger_click: bool = False
-        self.trigger_changed: bool = False
+        # Poses as orientation (x, y, z, w) followed by position (x, y, z)
+        self.pose_array: np.ndarray = np.array([0, 0, 0, 1, 0, 0, 0], np.float32)
+        self.pose_aim_array: np.ndarray = self.pose_array.copy()
+        # Bitmasks of pressed buttons and buttons changed since the previous frame
+        self.buttons: int = 0
+        self.buttons_changed: int = 0
         self.trigger_value: float = 0.0
-        self.a_click: bool = False
-        self.a_changed: bool = False
-        self.b_click: bool = False
-        self.b_changed: bool = False
         self.thumbstick_x: float = 0.0
         self.thumbstick_y: float = 0.0
-        # Outputs
-        self.vibration: bool = False
 
     @property
-    def a_clicked(self):
-        """True if A was clicked during this frame."""
-        return self.a_click and self.a_changed
+    def trigger_click(self) -> bool:
+        """True if Trigger is pressed."""
+        return bool(self.buttons & TRIGGER_BUTTON)
 
     @property
-    def b_clicked(self):
-        """True if B was clicked during this frame."""
-        return self.b_click and self.b_changed
+    def trigger_changed(self) -> bool:
+        """True if Trigger state changed during this frame."""
+        return bool(self.buttons_changed & TRIGGER_BUTTON)
 
     @property
-    def trigger_clicked(self):
+    def trigger_clicked(self) -> bool:
         """True if Trigger was clicked during this frame."""
-        return self.trigger_click and self.trigger_changed
+        return bool(self.buttons & self.buttons_changed & TRIGGER_BUTTON)
+
+    @property
+    def a_click(self) -> bool:
+        """True if A is pressed."""
+        return bool(self.buttons & A_BUTTON)
+
+    @property
+    def a_changed(self) -> bool:
+        """True if A state changed during this frame."""
+        return bool(self.buttons_changed & A_BUTTON)
+
+    @property
+    def a_clicked(self) -> bool:
+        """True if A was clicked during this frame."""
+        return bool(self.buttons & self.buttons_changed & A_BUTTON)
+
+    @property
+    def b_click(self) -> bool:
+        """True if B is pressed."""
+        return bool(self.buttons & B_BUTTON)
+
+    @property
+    def b_changed(self) -> bool:
+        """True if B state changed during this frame."""
+        return bool(self.buttons_changed & B_BUTTON)
+
+    @property
+    def b_clicked(self) -> bool:
+        """True if B was clicked during this frame."""
+        return bool(self.buttons & self.buttons_changed & B_BUTTON)
 
 
 class Controller:
@@ -93,11 +137,11 @@ class Controller:
             else ControllerState()
         )
         if state.is_active:
-            pose = state.pose
+            pose = state.pose_array
             self._controller.set_position(
-                vector_from_pyopenxr(pose.position) + space_offset.position.as_numpy()
+                vector_from_pyopenxr(pose[4:]) + space_offset.position.as_numpy()
             )
-            self._controller.set_quaternion(quaternion_from_pyopenxr(pose.orientation))
+            self._controller.set_quaternion(quaternion_from_pyopenxr(pose[:4]))
         else:
             self._controller.set_position(CONTROLLER_NOT_ACTIVE_POSITION)
             self._controller.set_quaternion(CONTROLLER_NOT_ACTIVE_ROTATION)
@@ -105,4 +149,4 @@ class Controller:
     def vibrate(self):
         """Activate controller's vibration."""
         if self._context:
-            self._context.input.state[self._side].vibration = True
+            self._context.input.request_vibration(self._side)
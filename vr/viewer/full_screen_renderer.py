@@ -1,37 +1,24 @@
 """Renders a full-screen image from NumPy array data using OpenGL."""
-import inspect
+import ctypes
 
 import numpy as np
 from OpenGL import GL
-from OpenGL.GL.shaders import compileShader, compileProgram
 
 from vr.viewer import Side
 
-VERTEX_SHADER = """
-#version 150 core
-out vec2 v_tex;
-
-const vec2 pos[4]=vec2[4](vec2(-1.0, 1.0),
-                          vec2(-1.0,-1.0),
-                          vec2( 1.0, 1.0),
-                          vec2( 1.0,-1.0));
-
-void main()
-{
-    v_tex=0.5*pos[gl_VertexID] + vec2(0.5);
-    gl_Position=vec4(pos[gl_VertexID], 0.0, 1.0);
-}
-"""
-FRAGMENT_SHADER = """
-#version 150 core
-in vec2 v_tex;
-uniform sampler2D texSampler;
-out vec4 color;
-void main()
-{
-    color=texture(texSampler, v_tex);
-}
-"""
+# Amount of pixel buffers used in round-robin fashion.
+# While one is being read by the GPU, the next one can be filled.
+PIXEL_BUFFERS_COUNT = 2
+CHANNELS_COUNT = 3
+# Pixel buffers stay mapped for the lifetime of the renderer when buffer storage
+# is available (GL 4.4 or ARB_buffer_storage), otherwise they are orphaned and
+# refilled from client memory every frame
+PIXEL_BUFFER_FLAGS = (
+    GL.GL_MAP_WRITE_BIT | GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT
+)
+BUFFER_STORAGE_GL_VERSION = (4, 4)
+BUFFER_STORAGE_EXTENSION = b"GL_ARB_buffer_storage"
+FENCE_TIMEOUT_NS = 1_000_000_000
 
 
 class VRFullScreenRenderer:
@@ -45,83 +32,167 @@ class VRFullScreenRenderer:
         """
         self._width = width
         self._height = height
-        self._shader = self._create_shader()
-        self._vertex_array = GL.glGenVertexArrays(1)
-        GL.glBindVertexArray(self._vertex_array)
-        GL.glEnable(GL.GL_DEPTH_TEST)
-        GL.glClearColor(0, 0, 0, 1)
-        GL.glClearDepth(1.0)
-        self._tex_ids = {
-            Side.LEFT: self._create_texture(),
-            Side.RIGHT: self._create_texture(),
-        }
-
-    @staticmethod
-    def _create_shader() -> int:
-        vertex_shader = compileShader(
-            inspect.cleandoc(VERTEX_SHADER),
-            GL.GL_VERTEX_SHADER,
-        )
-        fragment_shader = compileShader(
-            inspect.cleandoc(FRAGMENT_SHADER),
-            GL.GL_FRAGMENT_SHADER,
-        )
-
-        return compileProgram(vertex_shader, fragment_shader)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        # Single texture holding side-by-side stereo frame, each eye blits its half
+        self._tex_id = self._create_texture(2 * width, height)
+        self._read_framebuffer = self._create_read_framebuffer(self._tex_id)
+        self._persistent = self._supports_buffer_storage()
+        self._pixel_buffers = []
+        self._pixel_arrays = []
+        for _ in range(PIXEL_BUFFERS_COUNT):
+            pixel_buffer, pixel_array = self._create_pixel_buffer(
+                2 * width, height, self._persistent
+            )
+            self._pixel_buffers.append(pixel_buffer)
+            self._pixel_arrays.append(pixel_array)
+        self._pixel_buffer_fences = [None] * PIXEL_BUFFERS_COUNT
+        self._pixel_buffer_index = 0
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """Pixel array to write the next side-by-side stereo frame into.
+
+        Rows are expected bottom to top, as read by `glReadPixels`.
+        """
+        return self._pixel_arrays[self._pixel_buffer_index]
 
     @staticmethod
-    def _create_texture() -> int:
+    def _create_texture(width: int, height: int) -> int:
         texid = GL.glGenTextures(1)
         GL.glBindTexture(GL.GL_TEXTURE_2D, texid)
         GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP)
         GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP)
         GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
         GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-        return texid
-
-    @staticmethod
-    def _update_texture(texture_id, width, height, data):
-        GL.glBindTexture(GL.GL_TEXTURE_2D, texture_id)
+        # Allocate storage once, texture is updated with glTexSubImage2D
         GL.glTexImage2D(
             GL.GL_TEXTURE_2D,
             0,
-            GL.GL_RGB,
+            GL.GL_RGB8,
             width,
             height,
             0,
             GL.GL_RGB,
             GL.GL_UNSIGNED_BYTE,
-            data,
+            None,
         )
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        return texid
 
-    def render(self, side: Side, pixels: np.array):
-        """Render pixels to the active buffer.
+    @staticmethod
+    def _create_read_framebuffer(texture: int) -> int:
+        framebuffer = GL.glGenFramebuffers(1)
+        previous_framebuffer = int(GL.glGetIntegerv(GL.GL_READ_FRAMEBUFFER_BINDING))
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, framebuffer)
+        GL.glFramebufferTexture2D(
+            GL.GL_READ_FRAMEBUFFER,
+            GL.GL_COLOR_ATTACHMENT0,
+            GL.GL_TEXTURE_2D,
+            texture,
+            0,
+        )
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, previous_framebuffer)
+        return framebuffer
 
-        Args:
-            side: The side of the headset to render the pixels to.
-            pixels: The pixel data to render.
-        """
-        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
-
-        # ToDo (nchernyadev): find better way to update textures
-        #  instead of using slow glTexImage2D
-        pixels = (
-            pixels[:, : self._width, :]
-            if side == Side.LEFT
-            else pixels[:, self._width :, :]
+    @staticmethod
+    def _supports_buffer_storage() -> bool:
+        version = (
+            int(GL.glGetIntegerv(GL.GL_MAJOR_VERSION)),
+            int(GL.glGetIntegerv(GL.GL_MINOR_VERSION)),
         )
-        self._update_texture(
-            self._tex_ids[side],
-            self._width,
-            self._height,
-            pixels,
+        if version >= BUFFER_STORAGE_GL_VERSION:
+            return True
+        extensions_count = int(GL.glGetIntegerv(GL.GL_NUM_EXTENSIONS))
+        return any(
+            GL.glGetStringi(GL.GL_EXTENSIONS, i) == BUFFER_STORAGE_EXTENSION
+            for i in range(extensions_count)
         )
 
-        # Render full-screen quad
-        GL.glUseProgram(self._shader)
-        GL.glBindVertexArray(self._vertex_array)
-        GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
-
-        # Unbind texture
+    @staticmethod
+    def _create_pixel_buffer(
+        width: int, height: int, persistent: bool
+    ) -> tuple[int, np.ndarray]:
+        size = width * height * CHANNELS_COUNT
+        pixel_buffer = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pixel_buffer)
+        if persistent:
+            GL.glBufferStorage(
+                GL.GL_PIXEL_UNPACK_BUFFER, size, None, PIXEL_BUFFER_FLAGS
+            )
+            pointer = GL.glMapBufferRange(
+                GL.GL_PIXEL_UNPACK_BUFFER, 0, size, PIXEL_BUFFER_FLAGS
+            )
+            data = ctypes.cast(pointer, ctypes.POINTER(ctypes.c_ubyte * size)).contents
+            pixel_array = np.ctypeslib.as_array(data).reshape(
+                (height, width, CHANNELS_COUNT)
+            )
+        else:
+            GL.glBufferData(GL.GL_PIXEL_UNPACK_BUFFER, size, None, GL.GL_STREAM_DRAW)
+            pixel_array = np.empty((height, width, CHANNELS_COUNT), dtype=np.uint8)
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+        return pixel_buffer, pixel_array
+
+    def upload(self):
+        """Upload stereo frame written to `pixels` to the texture of both eyes."""
+        index = self._pixel_buffer_index
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self._pixel_buffers[index])
+        if not self._persistent:
+            pixels = self._pixel_arrays[index]
+            # Orphan previous storage to avoid waiting for pending transfers
+            GL.glBufferData(
+                GL.GL_PIXEL_UNPACK_BUFFER, pixels.nbytes, None, GL.GL_STREAM_DRAW
+            )
+            GL.glBufferSubData(GL.GL_PIXEL_UNPACK_BUFFER, 0, pixels.nbytes, pixels)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._tex_id)
+        # Pixels are sourced from the bound pixel buffer, starting at offset 0
+        GL.glTexSubImage2D(
+            GL.GL_TEXTURE_2D,
+            0,
+            0,
+            0,
+            2 * self._width,
+            self._height,
+            GL.GL_RGB,
+            GL.GL_UNSIGNED_BYTE,
+            ctypes.c_void_p(0),
+        )
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+        if self._persistent:
+            self._pixel_buffer_fences[index] = GL.glFenceSync(
+                GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0
+            )
+
+        # Make sure the GPU finished reading the next buffer before it is rewritten
+        index = (index + 1) % PIXEL_BUFFERS_COUNT
+        self._pixel_buffer_index = index
+        fence = self._pixel_buffer_fences[index]
+        if fence is not None:
+            GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, FENCE_TIMEOUT_NS)
+            GL.glDeleteSync(fence)
+            self._pixel_buffer_fences[index] = None
+
+    def render(self, side: Side):
+        """Blit half of the stereo texture of the given side to the active viewport.
+
+        Args:
+            side: The side of the headset to render.
+        """
+        x, y, width, height = GL.glGetIntegerv(GL.GL_VIEWPORT)
+        previous_framebuffer = int(GL.glGetIntegerv(GL.GL_READ_FRAMEBUFFER_BINDING))
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self._read_framebuffer)
+        src_x = side * self._width
+        # Pixels are uploaded bottom row first as read, no flip is needed
+        GL.glBlitFramebuffer(
+            src_x,
+            0,
+            src_x + self._width,
+            self._height,
+            x,
+            y,
+            x + width,
+            y + height,
+            GL.GL_COLOR_BUFFER_BIT,
+            GL.GL_LINEAR,
+        )
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, previous_framebuffer)
@@ -1,7 +1,5 @@
 """Converts vectors and quaternions from pyopenxr to mujoco space."""
 import numpy as np
-import xr
-from pyquaternion import Quaternion
 from xr import Vector3f, Quaternionf
 
 
@@ -18,24 +16,42 @@ def vector_from_pyopenxr(xr_vector: [Vector3f, np.array]) -> np.ndarray:
     mujoco_vector = [xr_vector[0], -xr_vector[2], xr_vector[1]]
     """
     if isinstance(xr_vector, Vector3f):
-        xr_vector = xr_vector.as_numpy()
+        return np.array([xr_vector.x, -xr_vector.z, xr_vector.y])
     return np.array([xr_vector[0], -xr_vector[2], xr_vector[1]])
 
 
-def quaternion_from_pyopenxr(xr_quaternion: Quaternionf) -> np.ndarray:
-    """Convert pyopenxr quaternion to mujoco space."""
-    xr_quaternion = Quaternion(
-        xr_quaternion.w, xr_quaternion.x, xr_quaternion.y, xr_quaternion.z
+def quaternion_from_pyopenxr(xr_quaternion: [Quaternionf, np.array]) -> np.ndarray:
+    """Convert pyopenxr quaternion to mujoco space.
+
+    The quaternion is conjugated by a 90-degree rotation along the X-axis, i.e.,
+    the scalar part is kept and the vector part is rotated the same way as in
+    `vector_from_pyopenxr`:
+
+    mujoco_quaternion = [w, x, -z, y]
+
+    Arrays are expected in pyopenxr order, i.e., [x, y, z, w].
+    """
+    if isinstance(xr_quaternion, Quaternionf):
+        return np.array(
+            [xr_quaternion.w, xr_quaternion.x, -xr_quaternion.z, xr_quaternion.y]
+        )
+    return np.array(
+        [xr_quaternion[3], xr_quaternion[0], -xr_quaternion[2], xr_quaternion[1]]
     )
-    xr_quaternion = Quaternion(axis=[1, 0, 0], degrees=90).rotate(xr_quaternion)
-    return xr_quaternion.elements
 
 
 def camera_axes_from_pyopenxr(
-    xr_quaternion: Quaternionf,
+    w: float, x: float, y: float, z: float
 ) -> tuple[np.ndarray, np.ndarray]:
-    """Convert pyopenxr quaternion to mujoco forward and up axes."""
-    orientation = xr.Matrix4x4f.create_from_quaternion(xr_quaternion).as_numpy()
-    forward = vector_from_pyopenxr(orientation[8:11])
-    up = vector_from_pyopenxr(orientation[4:7])
+    """Convert pyopenxr orientation to mujoco camera forward and up axes.
+
+    Forward is the inverted Z-axis and up is the Y-axis of the rotation matrix,
+    both converted the same way as in `vector_from_pyopenxr`. Mujoco cameras
+    look along the inverted forward axis, see the documentation:
+    https://mujoco.readthedocs.io/en/stable/programming/visualization.html
+    """
+    forward = np.array(
+        [-2 * (x * z + w * y), 1 - 2 * (x * x + y * y), -2 * (y * z - w * x)]
+    )
+    up = np.array([2 * (x * y - w * z), -2 * (y * z + w * x), 1 - 2 * (x * x + z * z)])
     return forward, up
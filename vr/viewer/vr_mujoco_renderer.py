@@ -1,24 +1,60 @@
 """VR Mujoco renderer class rendering mujoco environment to VR headset."""
-from typing import Optional, Any
+import math
+from dataclasses import dataclass
+from typing import Optional, Any, Callable
 
 import mujoco
 import numpy as np
-import xr
 from mojo import Mojo
-from xr import FrameState, View, Posef, Quaternionf, Vector3f
+from xr import FrameState, View, Posef
 
 from vr.viewer import Side
 from vr.viewer.full_screen_renderer import VRFullScreenRenderer
-from vr.viewer.pyopenxr_to_mujoco_converter import vector_from_pyopenxr
+from vr.viewer.pyopenxr_to_mujoco_converter import (
+    vector_from_pyopenxr,
+    camera_axes_from_pyopenxr,
+)
 from vr.viewer.xr_context import XRContextObject
 
 RENDER_REFLECTIONS = False
 RENDER_SHADOWS = False
 RENDER_FOG = False
 
+SIDES = tuple(Side)
+
+Z_NEAR = 0.01
+Z_FAR = 50.0
+
+MarkerWriter = Callable[[mujoco.MjvGeom, dict], None]
+
+FLOAT_LABEL_FORMAT = "{}: {:.2f}".format
+LABEL_FORMAT = "{}: {}".format
+
+# Default marker geometry, markers without explicit fields are small white labels
+MARKER_SIZE = np.full(3, 0.1)
+MARKER_POS = np.zeros(3)
+MARKER_MAT = np.eye(3).flatten()
+MARKER_RGBA = np.ones(4, dtype=np.float32)
+
+STATS_SPACING = np.array([0, 0, -0.1])
+
+
+@dataclass
+class CameraState:
+    """Mujoco camera parameters computed from pyopenxr view."""
+
+    frustum_bottom: float
+    frustum_top: float
+    frustum_center: float
+    forward: np.ndarray
+    up: np.ndarray
+    pos: np.ndarray
+    # Tangent of the half-angle of a cone enclosing the view frustum
+    cone_tan: float
+
 
 class Renderer(mujoco.Renderer):
-    """Customized mujoco.Renderer with decreased font size."""
+    """Customized mujoco.Renderer with decreased font size and unflipped output."""
 
     def __init__(
         self,
@@ -37,6 +73,16 @@ class Renderer(mujoco.Renderer):
             mujoco.mjtFramebuffer.mjFB_OFFSCREEN.value, self._mjr_context
         )
 
+    def render_to(self, out: np.ndarray):
+        """Render the scene into RGB array with rows ordered bottom to top.
+
+        Unlike `render`, pixels are read as is without flipping them on CPU.
+        """
+        if self._gl_context:
+            self._gl_context.make_current()
+        mujoco.mjr_render(self._rect, self._scene, self._mjr_context)
+        mujoco.mjr_readPixels(out, None, self._rect, self._mjr_context)
+
 
 class VRMujocoRenderer:
     """VR Mujoco renderer class rendering mujoco environment to VR headset."""
@@ -48,9 +94,17 @@ class VRMujocoRenderer:
         self._height = height
 
         self._markers = []
+        # Marker writers specialized per set of marker keys and value types
+        self._marker_writers: dict[tuple, MarkerWriter] = {}
+        # Stats markers persist between frames and are rewritten in place
+        self._stats_markers: list[dict[str, Any]] = []
+        self._stats_count = 0
+        # Key and value each stats label was built from, labels are rebuilt on change
+        self._stats_values: list[Optional[tuple[str, Any]]] = []
 
         self._renderer = Renderer(self._mojo.model, self._height, self._width)
-        self._renderer.scene.stereo = mujoco.mjtStereo.mjSTEREO_QUADBUFFERED
+        # Both eyes in a single pass, left eye in the left half of the frame
+        self._renderer.scene.stereo = mujoco.mjtStereo.mjSTEREO_SIDEBYSIDE
         self._renderer.scene.flags[mujoco.mjtRndFlag.mjRND_REFLECTION] = int(
             RENDER_REFLECTIONS
         )
@@ -58,6 +112,9 @@ class VRMujocoRenderer:
         self._renderer.scene.flags[mujoco.mjtRndFlag.mjRND_FOG] = int(RENDER_FOG)
         self._vr_camera = mujoco.MjvCamera()
 
+        # Raw view and offset bytes with resulting camera state, per camera
+        self._view_cache: dict[int, tuple[bytes, CameraState]] = {}
+
         # Will be initialized after creation of the VR session
         self._context: Optional[XRContextObject] = None
         self._headset_renderer: Optional[VRFullScreenRenderer] = None
@@ -75,18 +132,26 @@ class VRMujocoRenderer:
         self,
         info: dict[str, Any],
         pos: np.ndarray,
-        spacing: np.ndarray = np.array([0, 0, -0.1]),
+        spacing: Optional[np.ndarray] = None,
     ):
-        """Show label with information from dictionary."""
-        label_pos = pos.copy()
-        for key, value in info.items():
+        """Show label with information from dictionary until the next call."""
+        if spacing is None:
+            spacing = STATS_SPACING
+        for index, (key, value) in enumerate(info.items()):
+            if index == len(self._stats_markers):
+                self._stats_markers.append({"pos": np.zeros(3), "label": ""})
+                self._stats_values.append(None)
+            marker = self._stats_markers[index]
+            np.multiply(spacing, index, out=marker["pos"])
+            marker["pos"] += pos
+            if self._stats_values[index] == (key, value):
+                continue
+            self._stats_values[index] = (key, value)
             if isinstance(value, float):
-                value = f"{value:.2f}"
+                marker["label"] = FLOAT_LABEL_FORMAT(key, value)
             else:
-                value = str(value)
-            label = f"{key}: {value}"
-            self.add_marker(pos=label_pos.copy(), label=label)
-            label_pos += spacing
+                marker["label"] = LABEL_FORMAT(key, value)
+        self._stats_count = len(info)
 
     def add_marker(self, **marker_params):
         """Add marker to scene."""
@@ -96,83 +161,141 @@ class VRMujocoRenderer:
         """Render current state of the environment to VR headset."""
         self._renderer.update_scene(self._mojo.data, self._vr_camera)
         self._sync_mujoco_vr_cameras_with_views(self._context.input.views, offset)
-        pixels = self._render_mujoco_env()
-        for view_index, _ in enumerate(self._context.view_loop(frame_state)):
-            self._headset_renderer.render(Side(view_index), pixels)
-
-    def _render_mujoco_env(self) -> np.array:
-        for marker in self._markers:
-            self._add_marker_to_scene(marker)
-        pixels = np.flipud(self._renderer.render())
+        self._add_markers_to_scene(
+            self._markers + self._stats_markers[: self._stats_count]
+        )
         self._markers.clear()
-        return pixels
+        # Read pixels straight into the next pixel array of the headset renderer
+        self._renderer.render_to(self._headset_renderer.pixels)
+
+        for _, side in zip(self._context.view_loop(frame_state), SIDES):
+            # Headset GL context is current only inside the view loop
+            if side == Side.LEFT:
+                self._headset_renderer.upload()
+            self._headset_renderer.render(side)
 
     def _sync_mujoco_vr_cameras_with_views(self, views: list[View], offset: Posef):
+        offset_key = bytes(offset)
         for camera_id, camera in enumerate(self._scene.camera):
             view = views[camera_id]
-            z_near, z_far = 0.01, 50.0
-            tan_left, tan_right, tan_down, tan_up = np.tan(view.fov.as_numpy())
-
-            # Setup camera frustum
-            camera.frustum_bottom = -tan_down * z_near
-            camera.frustum_top = -tan_up * z_near
-            camera.frustum_center = 0.5 * (tan_left + tan_right) * z_near
-            camera.frustum_near = z_near
-            camera.frustum_far = z_far
-
-            # Column-major view matrix
-            orientation = xr.Matrix4x4f.create_from_quaternion(view.pose.orientation)
-            if offset.orientation != Quaternionf():
-                orientation_offset = xr.Matrix4x4f.create_from_quaternion(
-                    offset.orientation
-                )
-                orientation = orientation.multiply(orientation_offset)
-            orientation = orientation.as_numpy()
-            # Forward is the 3rd column of the view matrix - elements [8], [9], [10]
-            # Up is the 2nd column of the view matrix - elements [4], [6], [5]
-            # Also we have to invert forward axis, according to the documentation:
-            # https://mujoco.readthedocs.io/en/stable/programming/visualization.html
-            camera.forward = -vector_from_pyopenxr(orientation[8:11])
-            camera.up = vector_from_pyopenxr(orientation[4:7])
-            camera.pos = vector_from_pyopenxr(view.pose.position)
-            if offset.position != Vector3f():
-                camera.pos += offset.position.as_numpy()
-
-    def _add_marker_to_scene(self, marker: dict):
-        if self._scene.ngeom >= self._scene.maxgeom:
+            # Scene cameras are overwritten by update_scene, so state is always set
+            key = bytes(view.pose) + bytes(view.fov) + offset_key
+            cached = self._view_cache.get(camera_id)
+            if cached is None or cached[0] != key:
+                cached = (key, self._get_camera_state(view, offset))
+                self._view_cache[camera_id] = cached
+            state = cached[1]
+
+            camera.frustum_bottom = state.frustum_bottom
+            camera.frustum_top = state.frustum_top
+            camera.frustum_center = state.frustum_center
+            camera.frustum_near = Z_NEAR
+            camera.frustum_far = Z_FAR
+            camera.forward = state.forward
+            camera.up = state.up
+            camera.pos = state.pos
+
+    @staticmethod
+    def _get_camera_state(view: View, offset: Posef) -> CameraState:
+        tan_left, tan_right, tan_down, tan_up = map(math.tan, view.fov.as_numpy())
+
+        # Compose view and offset orientations, same as multiplying their matrices
+        q = view.pose.orientation
+        w, x, y, z = q.w, q.x, q.y, q.z
+        o = offset.orientation
+        if (o.x, o.y, o.z, o.w) != (0, 0, 0, 1):
+            w, x, y, z = (
+                w * o.w - x * o.x - y * o.y - z * o.z,
+                w * o.x + x * o.w + y * o.z - z * o.y,
+                w * o.y - x * o.z + y * o.w + z * o.x,
+                w * o.z + x * o.y - y * o.x + z * o.w,
+            )
+        forward, up = camera_axes_from_pyopenxr(w, x, y, z)
+        pos = vector_from_pyopenxr(view.pose.position)
+        p = offset.position
+        if (p.x, p.y, p.z) != (0, 0, 0):
+            pos += (p.x, p.y, p.z)
+
+        return CameraState(
+            frustum_bottom=-tan_down * Z_NEAR,
+            frustum_top=-tan_up * Z_NEAR,
+            frustum_center=0.5 * (tan_left + tan_right) * Z_NEAR,
+            forward=forward,
+            up=up,
+            pos=pos,
+            cone_tan=math.hypot(
+                max(abs(tan_left), abs(tan_right)), max(abs(tan_down), abs(tan_up))
+            ),
+        )
+
+    def _get_visible_markers(self, markers: list[dict]) -> list[dict]:
+        """Get markers intersecting the view cone of at least one camera."""
+        if not markers:
+            return markers
+        positions = np.array([m.get("pos", MARKER_POS) for m in markers])
+        radii = np.array([np.max(m.get("size", MARKER_SIZE)) for m in markers])
+        visible = np.zeros(len(markers), dtype=bool)
+        for _, state in self._view_cache.values():
+            offsets = positions - state.pos
+            depth = offsets @ state.forward
+            lateral = np.linalg.norm(offsets - np.outer(depth, state.forward), axis=1)
+            visible |= (
+                (depth > -radii)
+                & (depth < Z_FAR + radii)
+                & (lateral <= depth * state.cone_tan + radii * (1 + state.cone_tan))
+            )
+        return [marker for marker, v in zip(markers, visible) if v]
+
+    def _add_markers_to_scene(self, markers: list[dict]):
+        markers = self._get_visible_markers(markers)
+        ngeom = self._scene.ngeom
+        if ngeom + len(markers) > self._scene.maxgeom:
             raise RuntimeError("Ran out of geoms. maxgeom: %d" % self._scene.maxgeom)
 
-        g = self._scene.geoms[self._scene.ngeom]
-        # default values.
-        g.dataid = -1
-        g.objtype = mujoco.mjtObj.mjOBJ_UNKNOWN
-        g.objid = -1
-        g.category = mujoco.mjtCatBit.mjCAT_DECOR
-        g.texid = -1
-        g.texuniform = 0
-        g.texrepeat[0] = 1
-        g.texrepeat[1] = 1
-        g.emission = 0
-        g.specular = 0.5
-        g.shininess = 0.5
-        g.reflectance = 0
-        g.type = mujoco.mjtGeom.mjGEOM_LABEL
-        g.size[:] = np.ones(3) * 0.1
-        g.mat[:] = np.eye(3)
-        g.rgba[:] = np.ones(4)
+        for index, marker in enumerate(markers, start=ngeom):
+            g = self._scene.geoms[index]
+            # Default values are filled in a single call
+            mujoco.mjv_initGeom(
+                g,
+                mujoco.mjtGeom.mjGEOM_LABEL,
+                MARKER_SIZE,
+                MARKER_POS,
+                MARKER_MAT,
+                MARKER_RGBA,
+            )
+            g.objtype = mujoco.mjtObj.mjOBJ_UNKNOWN
+            g.objid = -1
+            g.category = mujoco.mjtCatBit.mjCAT_DECOR
+
+            schema = tuple((key, type(value)) for key, value in marker.items())
+            writer = self._marker_writers.get(schema)
+            if writer is None:
+                writer = self._create_marker_writer(g, marker)
+                self._marker_writers[schema] = writer
+            writer(g, marker)
+
+        self._scene.ngeom = ngeom + len(markers)
 
+    @staticmethod
+    def _create_marker_writer(g: mujoco.MjvGeom, marker: dict) -> MarkerWriter:
+        setters = []
         for key, value in marker.items():
             if isinstance(value, (int, float, mujoco.mjtGeom)):
-                setattr(g, key, value)
+
+                def setter(geom, v, key=key):
+                    setattr(geom, key, v)
+
             elif isinstance(value, (tuple, list, np.ndarray)):
-                attr = getattr(g, key)
-                attr[:] = np.asarray(value).reshape(attr.shape)
+
+                def setter(geom, v, key=key, shape=getattr(g, key).shape):
+                    getattr(geom, key)[:] = np.reshape(v, shape)
+
             elif isinstance(value, str):
                 assert key == "label", "Only label is a string in mjtGeom."
-                if value is None:
-                    g.label[0] = 0
-                else:
-                    g.label = value
+
+                def setter(geom, v):
+                    geom.label = v
+
             elif hasattr(g, key):
                 raise ValueError(
                     "mjtGeom has attr {} but type {} is invalid".format(
@@ -181,5 +304,10 @@ class VRMujocoRenderer:
                 )
             else:
                 raise ValueError("mjtGeom doesn't have field %s" % key)
+            setters.append((key, setter))
+
+        def write(geom: mujoco.MjvGeom, m: dict):
+            for k, set_value in setters:
+                set_value(geom, m[k])
 
-        self._scene.ngeom += 1
+        return write
@@ -75,6 +75,8 @@ class VRViewer:
     OFFSET_DELTA = 0.01
 
     INFO_POS = np.array([2, 0, 1.8])
+    # Stats are only for reading, refresh them every few frames
+    STATS_UPDATE_INTERVAL = 10
 
     def __init__(
         self,
@@ -107,6 +109,8 @@ class VRViewer:
         self._env.mojo.model.vis.global_.offwidth = self._width
         self._env.mojo.model.vis.global_.offheight = self._height
         self._env.reset()
+        # Converts half of display period in nanoseconds to physics steps
+        self._period_to_steps = 1 / (2_000_000_000 * self._env.mojo.physics.timestep())
 
         self._control_profile = control_profile_cls(self._env)
         self._renderer = VRMujocoRenderer(self._env.mojo, self._height, self._width)
@@ -115,6 +119,7 @@ class VRViewer:
         self._space_offset = Posef()
 
         self._stats = VRViewerStats()
+        self._stats_tick = 0
         self._stop_countdown: Optional[Countdown] = None
 
     def _vr_env(self, env_cls: Type[BiGymEnv]) -> Type[BiGymEnv]:
@@ -156,32 +161,35 @@ class VRViewer:
         on_running_event: Optional[EventType] = threading.Event(),
     ):
         """Start VR viewer."""
-        with XRContextObject(
-            instance_create_info=xr.InstanceCreateInfo(
-                enabled_extension_names=[
-                    xr.KHR_OPENGL_ENABLE_EXTENSION_NAME,
-                ],
-            ),
-        ) as self._context:
-            on_running_event.set()
-            self._renderer.set_context(self._context)
-            self._controller_left.set_context(self._context)
-            self._controller_right.set_context(self._context)
-            for frame_state in self._context.frame_loop():
-                self._handle_input(self._context)
-                steps_count = self._predict_steps_count(frame_state)
-                action = self._get_action(steps_count)
-                for _ in range(steps_count):
-                    self._env.step(action, fast=True)
-                    if self._stop_countdown:
-                        self._stop_countdown.step()
-                        if self._stop_countdown.is_up:
-                            self._stop_recording()
-                    elif self._env.reward > 0:
-                        self._stop_countdown = Countdown(TERMINATION_STEPS)
-                self._render_frame(frame_state)
-                if exit_event.is_set():
-                    break
+        try:
+            with XRContextObject(
+                instance_create_info=xr.InstanceCreateInfo(
+                    enabled_extension_names=[
+                        xr.KHR_OPENGL_ENABLE_EXTENSION_NAME,
+                    ],
+                ),
+            ) as self._context:
+                on_running_event.set()
+                self._renderer.set_context(self._context)
+                self._controller_left.set_context(self._context)
+                self._controller_right.set_context(self._context)
+                for frame_state in self._context.frame_loop():
+                    self._handle_input(self._context)
+                    steps_count = self._predict_steps_count(frame_state)
+                    action = self._get_action(steps_count)
+                    for _ in range(steps_count):
+                        self._env.step(action, fast=True)
+                        if self._stop_countdown:
+                            self._stop_countdown.step()
+                            if self._stop_countdown.is_up:
+                                self._stop_recording()
+                        elif self._env.reward > 0:
+                            self._stop_countdown = Countdown(TERMINATION_STEPS)
+                    self._render_frame(frame_state)
+                    if exit_event.is_set():
+                        break
+        finally:
+            self._control_profile.close()
 
     def _get_action(self, steps_count: int) -> np.ndarray:
         action = self._control_profile.get_next_action(
@@ -201,7 +209,7 @@ class VRViewer:
 
         # Control space offset
         input_y = context.input.state[Side.RIGHT].thumbstick_y
-        if np.abs(input_y) >= self.OFFSET_THRESHOLD:
+        if abs(input_y) >= self.OFFSET_THRESHOLD:
             self._space_offset.position.z += input_y * self.OFFSET_DELTA
 
         # Update controllers
@@ -209,7 +217,11 @@ class VRViewer:
         self._controller_right.update(self._space_offset)
 
     def _render_frame(self, frame_state: FrameState):
-        self._update_stats()
+        if self._stats_tick % self.STATS_UPDATE_INTERVAL == 0:
+            self._update_stats()
+        self._stats_tick += 1
+        # Physics stepping takes time, refresh views right before rendering
+        self._context.input.update_views(frame_state.predicted_display_time)
         self._renderer.render(frame_state, self._space_offset)
 
     def _start_recording(self):
@@ -234,12 +246,8 @@ class VRViewer:
             self._controller_left.vibrate()
 
     def _predict_steps_count(self, frame_state: FrameState) -> int:
-        # Convert nanoseconds to seconds and divide by 2
-        refresh_duration = frame_state.predicted_display_period / 2_000_000_000
-        return (
-            int(round(refresh_duration / self._env.mojo.physics.timestep()))
-            * self.STEPS_COUNT_FACTOR
-        )
+        steps = round(frame_state.predicted_display_period * self._period_to_steps)
+        return int(steps) * self.STEPS_COUNT_FACTOR
 
     def _update_stats(self):
         self._stats.is_recoding = self._demo_recorder.is_recording
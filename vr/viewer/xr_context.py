@@ -78,5 +78,6 @@ class XRContextObject(xr.ContextObject):
     def frame_loop(self):
         """Runs the frame loop and updates XR input."""
         for frame_state in super().frame_loop():
+            self.input.set_focused(self.session_state == xr.SessionState.FOCUSED)
             self.input.update(frame_state.predicted_display_time)
             yield frame_state
@@ -1,12 +1,38 @@
 """Module for handling pyopenxr input."""
 import ctypes
 from _ctypes import byref, POINTER
+from typing import Optional
 
+import numpy as np
 import xr
-from xr import View, Time, Posef, ReferenceSpaceType
+from xr import (
+    View,
+    Time,
+    Posef,
+    ReferenceSpaceType,
+    get_action_state_float,
+    get_action_state_boolean,
+    get_action_state_pose,
+    locate_space,
+    locate_views,
+    sync_actions,
+)
 
 from vr.viewer import Side
-from vr.viewer.controller import ControllerState
+from vr.viewer.controller import (
+    ControllerState,
+    TRIGGER_BUTTON,
+    A_BUTTON,
+    B_BUTTON,
+)
+
+SIDES = tuple(Side)
+HAND_PATHS = ("/user/hand/left", "/user/hand/right")
+# Orientation (x, y, z, w) followed by position (x, y, z), matching `Posef` layout
+POSE_ARRAY_SIZE = 7
+POSE_VALID_MASK = (
+    xr.SPACE_LOCATION_POSITION_VALID_BIT | xr.SPACE_LOCATION_ORIENTATION_VALID_BIT
+)
 
 
 class XRInput:
@@ -15,6 +41,41 @@ class XRInput:
     XRInput processes pyopenxr events and maps it to `ControllerState` objects.
     """
 
+    __slots__ = (
+        "_context",
+        "_state",
+        "_views",
+        "_hmd_pose",
+        "_pose_arrays",
+        "_focused",
+        "_pending_vibrations",
+        "_last_update_time",
+        "_paths",
+        "hand_subaction_paths",
+        "_subaction_paths_array",
+        "action_pose",
+        "action_pose_aim",
+        "action_vibrate",
+        "action_trigger_click",
+        "action_trigger_value",
+        "action_a",
+        "action_b",
+        "action_thumbstick_x",
+        "action_thumbstick_y",
+        "_get_infos",
+        "_button_actions",
+        "_float_actions",
+        "grip_spaces",
+        "aim_spaces",
+        "hmd_space",
+        "_view_locate_info",
+        "_active_action_set",
+        "_sync_info",
+        "_haptic_vibration",
+        "_haptic_feedback",
+        "_haptic_action_infos",
+    )
+
     def __init__(self, context: xr.ContextObject):
         """Init."""
         self._context = context
@@ -22,285 +83,143 @@ class XRInput:
         self._state: list[ControllerState] = [ControllerState(), ControllerState()]
         self._views: list[View] = [View(), View()]
         self._hmd_pose: Posef = Posef()
+        self._pose_arrays = np.zeros((len(SIDES), 2, POSE_ARRAY_SIZE), dtype=np.float32)
+        self._pose_arrays[..., 3] = 1
+        for side in SIDES:
+            self._state[side].pose_array = self._pose_arrays[side, 0]
+            self._state[side].pose_aim_array = self._pose_arrays[side, 1]
+        self._focused: bool = False
+        # Sides with vibration requested since the last focused update
+        self._pending_vibrations: set[Side] = set()
+        self._last_update_time: Optional[Time] = None
 
-        self.hand_subaction_paths: dict[int, xr.Path] = {
-            Side.LEFT: xr.string_to_path(self._context.instance, "/user/hand/left"),
-            Side.RIGHT: xr.string_to_path(self._context.instance, "/user/hand/right"),
-        }
+        self._paths: dict[str, xr.Path] = {}
+        self.hand_subaction_paths: tuple[xr.Path, xr.Path] = tuple(
+            self._path(hand) for hand in HAND_PATHS
+        )
+        self._subaction_paths_array = (xr.Path * len(self.hand_subaction_paths))(
+            *self.hand_subaction_paths
+        )
 
         # Create actions
-        self.action_pose = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.POSE_INPUT,
-                action_name="hand_pose",
-                localized_action_name="Hand Pose",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_pose = self._create_action(
+            xr.ActionType.POSE_INPUT, "hand_pose", "Hand Pose"
         )
-        self.action_pose_aim = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.POSE_INPUT,
-                action_name="hand_pose_aim",
-                localized_action_name="Hand Pose Aim",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_pose_aim = self._create_action(
+            xr.ActionType.POSE_INPUT, "hand_pose_aim", "Hand Pose Aim"
         )
-        self.action_vibrate = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.VIBRATION_OUTPUT,
-                action_name="hand_vibrate",
-                localized_action_name="Hand Vibrate",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_vibrate = self._create_action(
+            xr.ActionType.VIBRATION_OUTPUT, "hand_vibrate", "Hand Vibrate"
         )
-        self.action_trigger_click = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.BOOLEAN_INPUT,
-                action_name="hand_trigger_click",
-                localized_action_name="Hand Trigger Click",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_trigger_click = self._create_action(
+            xr.ActionType.BOOLEAN_INPUT, "hand_trigger_click", "Hand Trigger Click"
         )
-        self.action_trigger_value = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.FLOAT_INPUT,
-                action_name="hand_trigger_value",
-                localized_action_name="Hand Trigger Value",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_trigger_value = self._create_action(
+            xr.ActionType.FLOAT_INPUT, "hand_trigger_value", "Hand Trigger Value"
         )
-        self.action_a = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.BOOLEAN_INPUT,
-                action_name="hand_a",
-                localized_action_name="Hand A",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_a = self._create_action(
+            xr.ActionType.BOOLEAN_INPUT, "hand_a", "Hand A"
         )
-        self.action_b = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.BOOLEAN_INPUT,
-                action_name="hand_b",
-                localized_action_name="Hand B",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_b = self._create_action(
+            xr.ActionType.BOOLEAN_INPUT, "hand_b", "Hand B"
         )
-        self.action_thumbstick_x = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.FLOAT_INPUT,
-                action_name="hand_thumbstick_x",
-                localized_action_name="Hand Thumbstick X",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_thumbstick_x = self._create_action(
+            xr.ActionType.FLOAT_INPUT, "hand_thumbstick_x", "Hand Thumbstick X"
         )
-        self.action_thumbstick_y = xr.create_action(
-            action_set=self._context.default_action_set,
-            create_info=xr.ActionCreateInfo(
-                action_type=xr.ActionType.FLOAT_INPUT,
-                action_name="hand_thumbstick_y",
-                localized_action_name="Hand Thumbstick Y",
-                count_subaction_paths=len(self.hand_subaction_paths),
-                subaction_paths=self.hand_subaction_paths.values(),
-            ),
+        self.action_thumbstick_y = self._create_action(
+            xr.ActionType.FLOAT_INPUT, "hand_thumbstick_y", "Hand Thumbstick Y"
+        )
+
+        # Action state queries reuse prebuilt get-info structs
+        self._get_infos: dict[tuple[int, int], xr.ActionStateGetInfo] = {
+            (id(action), side): xr.ActionStateGetInfo(
+                action=action,
+                subaction_path=self.hand_subaction_paths[side],
+            )
+            for action in (
+                self.action_pose,
+                self.action_trigger_click,
+                self.action_trigger_value,
+                self.action_a,
+                self.action_b,
+                self.action_thumbstick_x,
+                self.action_thumbstick_y,
+            )
+            for side in SIDES
+        }
+
+        # Controller state buttons and values updated from actions
+        self._button_actions: tuple[tuple[int, xr.Action], ...] = (
+            (TRIGGER_BUTTON, self.action_trigger_click),
+            (A_BUTTON, self.action_a),
+            (B_BUTTON, self.action_b),
+        )
+        self._float_actions: tuple[tuple[str, xr.Action], ...] = (
+            ("trigger_value", self.action_trigger_value),
+            ("thumbstick_x", self.action_thumbstick_x),
+            ("thumbstick_y", self.action_thumbstick_y),
         )
 
         # Interaction paths from Khronos documentation:
         # https://registry.khronos.org/OpenXR/specs/1.0/html/xrspec.html#semantic-path-interaction-profiles
-        khr_select_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/select/click"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/select/click"
-            ),
-        ]
-        pose_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/grip/pose"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/grip/pose"
-            ),
-        ]
-        pose_aim_path = [
-            xr.string_to_path(self._context.instance, "/user/hand/left/input/aim/pose"),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/aim/pose"
-            ),
-        ]
-        haptic_path = [
-            xr.string_to_path(self._context.instance, "/user/hand/left/output/haptic"),
-            xr.string_to_path(self._context.instance, "/user/hand/right/output/haptic"),
-        ]
-        trigger_value_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/trigger/value"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/trigger/value"
-            ),
-        ]
-        trigger_click_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/trigger/click"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/trigger/click"
-            ),
-        ]
-        a_click_path = [
-            xr.string_to_path(self._context.instance, "/user/hand/left/input/a/click"),
-            xr.string_to_path(self._context.instance, "/user/hand/right/input/a/click"),
-        ]
-        b_click_path = [
-            xr.string_to_path(self._context.instance, "/user/hand/left/input/b/click"),
-            xr.string_to_path(self._context.instance, "/user/hand/right/input/b/click"),
-        ]
-        thumbstick_x_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/thumbstick/x"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/thumbstick/x"
-            ),
-        ]
-        thumbstick_y_path = [
-            xr.string_to_path(
-                self._context.instance, "/user/hand/left/input/thumbstick/y"
-            ),
-            xr.string_to_path(
-                self._context.instance, "/user/hand/right/input/thumbstick/y"
-            ),
-        ]
+        khr_select_path = self._hand_paths("input/select/click")
+        pose_path = self._hand_paths("input/grip/pose")
+        pose_aim_path = self._hand_paths("input/aim/pose")
+        haptic_path = self._hand_paths("output/haptic")
+        trigger_value_path = self._hand_paths("input/trigger/value")
+        trigger_click_path = self._hand_paths("input/trigger/click")
+        a_click_path = self._hand_paths("input/a/click")
+        b_click_path = self._hand_paths("input/b/click")
+        thumbstick_x_path = self._hand_paths("input/thumbstick/x")
+        thumbstick_y_path = self._hand_paths("input/thumbstick/y")
 
         # Binding simple KHR controller
-        khr_bindings = [
-            xr.ActionSuggestedBinding(self.action_pose, pose_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_pose, pose_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(self.action_pose_aim, pose_aim_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_pose_aim, pose_aim_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(self.action_vibrate, haptic_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_vibrate, haptic_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_click, khr_select_path[Side.LEFT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_click, khr_select_path[Side.RIGHT]
-            ),
-        ]
-        xr.suggest_interaction_profile_bindings(
-            instance=self._context.instance,
-            suggested_bindings=xr.InteractionProfileSuggestedBinding(
-                interaction_profile=xr.string_to_path(
-                    self._context.instance,
-                    "/interaction_profiles/khr/simple_controller",
-                ),
-                count_suggested_bindings=len(khr_bindings),
-                suggested_bindings=(xr.ActionSuggestedBinding * len(khr_bindings))(
-                    *khr_bindings
-                ),
+        self._suggest_bindings(
+            "/interaction_profiles/khr/simple_controller",
+            (
+                (self.action_pose, pose_path),
+                (self.action_pose_aim, pose_aim_path),
+                (self.action_vibrate, haptic_path),
+                (self.action_trigger_click, khr_select_path),
             ),
         )
         # Bindings for Valve Index
-        valve_bindings = [
-            xr.ActionSuggestedBinding(self.action_pose, pose_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_pose, pose_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(self.action_pose_aim, pose_aim_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_pose_aim, pose_aim_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(self.action_vibrate, haptic_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_vibrate, haptic_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_click, trigger_click_path[Side.LEFT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_click, trigger_click_path[Side.RIGHT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_value, trigger_value_path[Side.LEFT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_trigger_value, trigger_value_path[Side.RIGHT]
-            ),
-            xr.ActionSuggestedBinding(self.action_a, a_click_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_a, a_click_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(self.action_b, b_click_path[Side.LEFT]),
-            xr.ActionSuggestedBinding(self.action_b, b_click_path[Side.RIGHT]),
-            xr.ActionSuggestedBinding(
-                self.action_thumbstick_x, thumbstick_x_path[Side.LEFT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_thumbstick_x, thumbstick_x_path[Side.RIGHT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_thumbstick_y, thumbstick_y_path[Side.LEFT]
-            ),
-            xr.ActionSuggestedBinding(
-                self.action_thumbstick_y, thumbstick_y_path[Side.RIGHT]
-            ),
-        ]
-        xr.suggest_interaction_profile_bindings(
-            instance=self._context.instance,
-            suggested_bindings=xr.InteractionProfileSuggestedBinding(
-                interaction_profile=xr.string_to_path(
-                    self._context.instance,
-                    "/interaction_profiles/valve/index_controller",
-                ),
-                count_suggested_bindings=len(valve_bindings),
-                suggested_bindings=(xr.ActionSuggestedBinding * len(valve_bindings))(
-                    *valve_bindings
-                ),
+        self._suggest_bindings(
+            "/interaction_profiles/valve/index_controller",
+            (
+                (self.action_pose, pose_path),
+                (self.action_pose_aim, pose_aim_path),
+                (self.action_vibrate, haptic_path),
+                (self.action_trigger_click, trigger_click_path),
+                (self.action_trigger_value, trigger_value_path),
+                (self.action_a, a_click_path),
+                (self.action_b, b_click_path),
+                (self.action_thumbstick_x, thumbstick_x_path),
+                (self.action_thumbstick_y, thumbstick_y_path),
             ),
         )
 
-        self.grip_spaces: dict[int, xr.Space] = {
-            Side.LEFT: xr.create_action_space(
-                session=self._context.session,
-                create_info=xr.ActionSpaceCreateInfo(
-                    action=self.action_pose,
-                    subaction_path=self.hand_subaction_paths[Side.LEFT],
-                ),
-            ),
-            Side.RIGHT: xr.create_action_space(
+        self.grip_spaces: tuple[xr.Space, xr.Space] = tuple(
+            xr.create_action_space(
                 session=self._context.session,
                 create_info=xr.ActionSpaceCreateInfo(
                     action=self.action_pose,
-                    subaction_path=self.hand_subaction_paths[Side.RIGHT],
+                    subaction_path=subaction_path,
                 ),
-            ),
-        }
+            )
+            for subaction_path in self.hand_subaction_paths
+        )
 
-        self.aim_spaces: dict[int, xr.Space] = {
-            Side.LEFT: xr.create_action_space(
+        self.aim_spaces: tuple[xr.Space, xr.Space] = tuple(
+            xr.create_action_space(
                 session=self._context.session,
                 create_info=xr.ActionSpaceCreateInfo(
                     action=self.action_pose_aim,
-                    subaction_path=self.hand_subaction_paths[Side.LEFT],
+                    subaction_path=subaction_path,
                 ),
-            ),
-            Side.RIGHT: xr.create_action_space(
-                session=self._context.session,
-                create_info=xr.ActionSpaceCreateInfo(
-                    action=self.action_pose_aim,
-                    subaction_path=self.hand_subaction_paths[Side.RIGHT],
-                ),
-            ),
-        }
+            )
+            for subaction_path in self.hand_subaction_paths
+        )
 
         self.hmd_space = xr.create_reference_space(
             session=self._context.session,
@@ -309,6 +228,38 @@ class XRInput:
             ),
         )
 
+        # Only display time changes between view locate requests
+        self._view_locate_info = xr.ViewLocateInfo(
+            view_configuration_type=self._context.view_configuration_type,
+            space=self._context.space,
+        )
+
+        # Active action set never changes, so sync info is built once
+        self._active_action_set = xr.ActiveActionSet(
+            action_set=self._context.default_action_set,
+            subaction_path=xr.NULL_PATH,
+        )
+        self._sync_info = xr.ActionsSyncInfo(
+            count_active_action_sets=1,
+            active_action_sets=ctypes.pointer(self._active_action_set),
+        )
+
+        # Haptic feedback parameters are constant, so structs are built once
+        self._haptic_vibration = xr.HapticVibration(
+            amplitude=0.5,
+            duration=xr.MIN_HAPTIC_DURATION,
+            frequency=xr.FREQUENCY_UNSPECIFIED,
+        )
+        self._haptic_feedback = ctypes.cast(
+            byref(self._haptic_vibration), POINTER(xr.HapticBaseHeader)
+        ).contents
+        self._haptic_action_infos: tuple[xr.HapticActionInfo, ...] = tuple(
+            xr.HapticActionInfo(
+                action=self.action_vibrate, subaction_path=subaction_path
+            )
+            for subaction_path in self.hand_subaction_paths
+        )
+
     @property
     def state(self) -> list[ControllerState]:
         """Current state of controllers."""
@@ -324,40 +275,53 @@ class XRInput:
         """Current HMD pose."""
         return self._hmd_pose
 
-    def update(self, time: Time):
-        """Update process active input and update `ControllerState`."""
-        self._hmd_pose = xr.locate_space(
+    def set_focused(self, focused: bool):
+        """Set whether the session is focused and receives controller input."""
+        self._focused = focused
+
+    def request_vibration(self, side: Side):
+        """Request controller vibration to be applied on the next focused update."""
+        self._pending_vibrations.add(side)
+
+    def update_views(self, time: Time):
+        """Locate HMD and views using the latest pose prediction for given time."""
+        self._hmd_pose = locate_space(
             space=self.hmd_space, base_space=self._context.space, time=time
         ).pose
 
-        _, self._views = xr.locate_views(
+        self._view_locate_info.display_time = time
+        _, self._views = locate_views(
             session=self._context.session,
-            view_locate_info=xr.ViewLocateInfo(
-                view_configuration_type=self._context.view_configuration_type,
-                display_time=time,
-                space=self._context.space,
-            ),
+            view_locate_info=self._view_locate_info,
         )
 
-        active_action_set = xr.ActiveActionSet(
-            action_set=self._context.default_action_set,
-            subaction_path=xr.NULL_PATH,
-        )
+    def update(self, time: Time):
+        """Update process active input and update `ControllerState`."""
+        # Sample input only once per predicted display time
+        if time == self._last_update_time:
+            return
+        self._last_update_time = time
+
+        self.update_views(time)
+
+        if not self._focused:
+            # Actions are inactive while the session is not focused
+            for state in self._state:
+                state.is_active = False
+                state.buttons = 0
+                state.buttons_changed = 0
+                for attr, _ in self._float_actions:
+                    setattr(state, attr, 0.0)
+            return
 
         # Silencing this exception similarly to pyopenxr_examples repo:
         # https://github.com/cmbruns/pyopenxr_examples/blob/3149bc0853e9306063f4185b3c9d82683518669d/xr_examples/hello_xr/main.py#L96
         try:
-            xr.sync_actions(
-                session=self._context.session,
-                sync_info=xr.ActionsSyncInfo(
-                    count_active_action_sets=1,
-                    active_action_sets=ctypes.pointer(active_action_set),
-                ),
-            )
+            sync_actions(session=self._context.session, sync_info=self._sync_info)
         except xr.exception.SessionNotFocused:
             pass
 
-        for side in Side:
+        for side in SIDES:
             state = self._state[side]
 
             # Check if controller is available
@@ -369,96 +333,105 @@ class XRInput:
             # Update pose
             state.pose = self._get_space_pose(time, self.grip_spaces[side])
             state.pose_aim = self._get_space_pose(time, self.aim_spaces[side])
+            self._copy_pose(state.pose, state.pose_array)
+            self._copy_pose(state.pose_aim, state.pose_aim_array)
 
-            # Update trigger click
-            trigger_click_current = self._get_action_state_bool(
-                self.action_trigger_click, side
-            )
-            state.trigger_changed = trigger_click_current != state.trigger_click
-            state.trigger_click = trigger_click_current
-            # Update trigger pressure
-            state.trigger_value = self._get_action_state_float(
-                self.action_trigger_value, side
-            )
-            # Update A-button click
-            a_click_current = self._get_action_state_bool(self.action_a, side)
-            state.a_changed = a_click_current != state.a_click
-            state.a_click = a_click_current
-            # Update B-button click
-            b_click_current = self._get_action_state_bool(self.action_b, side)
-            state.b_changed = b_click_current != state.b_click
-            state.b_click = b_click_current
-            # Update Thumbstick X
-            state.thumbstick_x = self._get_action_state_float(
-                self.action_thumbstick_x, side
-            )
-            # Update Thumbstick Y
-            state.thumbstick_y = self._get_action_state_float(
-                self.action_thumbstick_y, side
-            )
+            # Update buttons and their changes since the previous frame
+            buttons = 0
+            for button, action in self._button_actions:
+                if self._get_action_state_bool(action, side):
+                    buttons |= button
+            state.buttons_changed = buttons ^ state.buttons
+            state.buttons = buttons
+            # Update trigger pressure and thumbstick axes
+            for attr, action in self._float_actions:
+                setattr(state, attr, self._get_action_state_float(action, side))
 
-            # Apply vibration
-            if state.vibration:
-                self._apply_vibration(self.action_vibrate, side)
-                state.vibration = False
+        # Apply requested vibrations, repeated requests result in a single pulse
+        for side in self._pending_vibrations:
+            self._apply_vibration(side)
+        self._pending_vibrations.clear()
 
-    def _get_action_state_float(self, action: xr.Action, hand: Side) -> float:
-        state = xr.get_action_state_float(
-            self._context.session,
-            xr.ActionStateGetInfo(
-                action=action,
-                subaction_path=self.hand_subaction_paths[hand],
+    def _create_action(
+        self, action_type: xr.ActionType, name: str, localized_name: str
+    ) -> xr.Action:
+        return xr.create_action(
+            action_set=self._context.default_action_set,
+            create_info=xr.ActionCreateInfo(
+                action_type=action_type,
+                action_name=name,
+                localized_action_name=localized_name,
+                count_subaction_paths=len(self._subaction_paths_array),
+                subaction_paths=self._subaction_paths_array,
             ),
         )
-        return state.current_state if state.is_active else 0
 
-    def _get_action_state_bool(self, action: xr.Action, hand: Side) -> bool:
-        state = xr.get_action_state_boolean(
-            self._context.session,
-            xr.ActionStateGetInfo(
-                action=action,
-                subaction_path=self.hand_subaction_paths[hand],
+    def _path(self, path: str) -> xr.Path:
+        if path not in self._paths:
+            self._paths[path] = xr.string_to_path(self._context.instance, path)
+        return self._paths[path]
+
+    def _hand_paths(self, component: str) -> tuple[xr.Path, xr.Path]:
+        return tuple(self._path(f"{hand}/{component}") for hand in HAND_PATHS)
+
+    def _suggest_bindings(
+        self,
+        interaction_profile: str,
+        bindings: tuple[tuple[xr.Action, tuple[xr.Path, xr.Path]], ...],
+    ):
+        sides_count = len(SIDES)
+        suggested_bindings = (
+            xr.ActionSuggestedBinding * (len(bindings) * sides_count)
+        )()
+        for i, (action, paths) in enumerate(bindings):
+            for side in SIDES:
+                binding = suggested_bindings[i * sides_count + side]
+                binding.action = action
+                binding.binding = paths[side]
+        xr.suggest_interaction_profile_bindings(
+            instance=self._context.instance,
+            suggested_bindings=xr.InteractionProfileSuggestedBinding(
+                interaction_profile=self._path(interaction_profile),
+                count_suggested_bindings=len(suggested_bindings),
+                suggested_bindings=suggested_bindings,
             ),
         )
+
+    def _get_action_state_float(self, action: xr.Action, hand: Side) -> float:
+        state = get_action_state_float(
+            self._context.session, self._get_infos[id(action), hand]
+        )
+        return state.current_state if state.is_active else 0.0
+
+    def _get_action_state_bool(self, action: xr.Action, hand: Side) -> bool:
+        state = get_action_state_boolean(
+            self._context.session, self._get_infos[id(action), hand]
+        )
         return state.current_state if state.is_active else False
 
     def _get_action_state_pose(self, action: xr.Action, hand: Side) -> bool:
-        state = xr.get_action_state_pose(
-            self._context.session,
-            xr.ActionStateGetInfo(
-                action=action,
-                subaction_path=self.hand_subaction_paths[hand],
-            ),
+        state = get_action_state_pose(
+            self._context.session, self._get_infos[id(action), hand]
         )
         return state.is_active
 
     def _get_space_pose(self, time: Time, space: xr.Space) -> Posef:
-        hand_space = xr.locate_space(
+        hand_space = locate_space(
             space=space,
             base_space=self._context.space,
             time=time,
         )
-        location_flags = hand_space.location_flags
-        if (
-            location_flags & xr.SPACE_LOCATION_POSITION_VALID_BIT != 0
-            and location_flags & xr.SPACE_LOCATION_ORIENTATION_VALID_BIT != 0
-        ):
+        if hand_space.location_flags & POSE_VALID_MASK == POSE_VALID_MASK:
             return hand_space.pose
         return Posef()
 
-    def _apply_vibration(self, action: xr.Action, hand: Side):
-        vibration = xr.HapticVibration(
-            amplitude=0.5,
-            duration=xr.MIN_HAPTIC_DURATION,
-            frequency=xr.FREQUENCY_UNSPECIFIED,
-        )
+    @staticmethod
+    def _copy_pose(pose: Posef, out: np.ndarray):
+        ctypes.memmove(out.ctypes.data, ctypes.addressof(pose), ctypes.sizeof(Posef))
+
+    def _apply_vibration(self, hand: Side):
         xr.apply_haptic_feedback(
             session=self._context.session,
-            haptic_action_info=xr.HapticActionInfo(
-                action=action,
-                subaction_path=self.hand_subaction_paths[hand],
-            ),
-            haptic_feedback=ctypes.cast(
-                byref(vibration), POINTER(xr.HapticBaseHeader)
-            ).contents,
+            haptic_action_info=self._haptic_action_infos[hand],
+            haptic_feedback=self._haptic_feedback,
         )